@@ -0,0 +1,227 @@
+"""Аналитика цен по снимку результатов запуска.
+
+Числовые поля товаров (из prepare_product_for_csv) складываются
+в колоночный снимок на массивах NumPy. По нему векторно считаются:
+статистика цен по категориям, глубина акций (price_promo против price)
+и изменения цен относительно снимка прошлого запуска.
+Требует numpy (необязательная зависимость).
+"""
+import json
+import os
+
+try:
+    import numpy as np
+except ImportError:  # необязательная зависимость
+    np = None
+
+
+def build_snapshot(rows: list[list], header: list[str]) -> dict:
+    """Колоночный снимок из строк товаров (без строки заголовков)"""
+    column = {name: index for index, name in enumerate(header)}
+
+    def floats(name: str) -> "np.ndarray":
+        index = column[name]
+        return np.array(
+            [np.nan if row[index] is None else row[index] for row in rows],
+            dtype=np.float64,
+        )
+
+    def strings(name: str) -> "np.ndarray":
+        index = column[name]
+        return np.array(
+            ["" if row[index] is None else str(row[index]) for row in rows],
+            dtype=str,
+        )
+
+    return {
+        "sku": strings("sku_article"),
+        "category": strings("sku_category"),
+        "price": floats("price"),
+        "price_promo": floats("price_promo"),
+        "status": floats("sku_status"),
+    }
+
+
+def save_snapshot(filename: str, snapshot: dict) -> None:
+    np.savez_compressed(filename, **snapshot)
+
+
+def load_snapshot(filename: str) -> dict:
+    """Снимок прошлого запуска, None -- если его нет"""
+    if not os.path.exists(filename):
+        return None
+    with np.load(filename) as data:
+        return {name: data[name] for name in data.files}
+
+
+def _round(values: "np.ndarray") -> list:
+    """Массив -> список для JSON, NaN -> None"""
+    return [None if np.isnan(v) else round(float(v), 4) for v in values]
+
+
+def _group_stats(
+    values: "np.ndarray", groups: "np.ndarray", groups_count: int
+) -> dict:
+    """Кол-во значений, среднее, минимум, медиана и максимум по группам.
+    NaN не учитываются
+    """
+    valid = ~np.isnan(values)
+    values, groups = values[valid], groups[valid]
+
+    count = np.bincount(groups, minlength=groups_count)
+    total = np.bincount(groups, weights=values, minlength=groups_count)
+
+    # сортировка по (группа, значение): у каждой группы свой отрезок
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    starts = np.cumsum(count) - count
+    has_values = count > 0
+    starts_present = starts[has_values]
+    ends_present = starts_present + count[has_values] - 1
+
+    minimum = np.full(groups_count, np.nan)
+    maximum = np.full(groups_count, np.nan)
+    median = np.full(groups_count, np.nan)
+    minimum[has_values] = sorted_values[starts_present]
+    maximum[has_values] = sorted_values[ends_present]
+    median[has_values] = (
+        sorted_values[(starts_present + ends_present) // 2]
+        + sorted_values[(starts_present + ends_present + 1) // 2]
+    ) / 2
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+
+    return {
+        "count": count.tolist(),
+        "mean": _round(mean),
+        "min": _round(minimum),
+        "median": _round(median),
+        "max": _round(maximum),
+    }
+
+
+def _unique_by_sku(snapshot: dict) -> dict:
+    """Снимок без повторов sku (товар бывает в нескольких категориях),
+    отсортированный по sku
+    """
+    _, first = np.unique(snapshot["sku"], return_index=True)
+    return {name: values[first] for name, values in snapshot.items()}
+
+
+def _only_categories(snapshot: dict, categories: "np.ndarray") -> dict:
+    keep = np.isin(snapshot["category"], categories)
+    return {name: values[keep] for name, values in snapshot.items()}
+
+
+def merge_snapshots(current: dict, previous: dict) -> dict:
+    """Текущий снимок плюс товары прошлого из категорий, которых нет
+    в текущем (в режиме демона цикл обновляет часть категорий)
+    """
+    if previous is None:
+        return current
+    keep = ~np.isin(previous["category"], current["category"])
+    return {
+        name: np.concatenate((values, previous[name][keep]))
+        for name, values in current.items()
+    }
+
+
+def price_changes(current: dict, previous: dict) -> dict:
+    """Изменения акционных цен относительно прошлого снимка.
+    Сравниваются только категории, которые есть в текущем снимке
+    """
+    previous = _only_categories(previous, np.unique(current["category"]))
+    current = _unique_by_sku(current)
+    previous = _unique_by_sku(previous)
+
+    position = np.searchsorted(previous["sku"], current["sku"])
+    position = np.minimum(position, max(len(previous["sku"]) - 1, 0))
+    matched = (
+        previous["sku"][position] == current["sku"]
+        if len(previous["sku"])
+        else np.zeros(len(current["sku"]), dtype=bool)
+    )
+
+    new_price = current["price_promo"][matched]
+    old_price = previous["price_promo"][position[matched]]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change = (new_price - old_price) / old_price
+    change = change[np.isfinite(change)]
+
+    removed = len(previous["sku"]) - int(np.count_nonzero(matched))
+    return {
+        "matched": int(np.count_nonzero(matched)),
+        "new": int(len(current["sku"]) - np.count_nonzero(matched)),
+        "removed": removed,
+        "increased": int(np.count_nonzero(change > 0)),
+        "decreased": int(np.count_nonzero(change < 0)),
+        "unchanged": int(np.count_nonzero(change == 0)),
+        "mean_change": _round(np.array([change.mean()]))[0]
+        if len(change)
+        else None,
+    }
+
+
+def summarize(snapshot: dict, previous: dict = None) -> dict:
+    """Сводка по снимку: по категориям и в целом"""
+    names, groups = np.unique(snapshot["category"], return_inverse=True)
+    groups_count = len(names)
+
+    price = snapshot["price"]
+    promo = snapshot["price_promo"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        depth = np.where(price > 0, 1 - promo / price, np.nan)
+    on_promo = (promo < price).astype(np.float64)
+    in_stock = snapshot["status"]
+
+    products = np.bincount(groups, minlength=groups_count).tolist()
+    prices = _group_stats(promo, groups, groups_count)
+    depths = _group_stats(depth, groups, groups_count)
+    promo_share = _group_stats(on_promo, groups, groups_count)["mean"]
+    stock_share = _group_stats(in_stock, groups, groups_count)["mean"]
+
+    categories = {}
+    for index, name in enumerate(names.tolist()):
+        categories[name] = {
+            "products": products[index],
+            "price_promo": {
+                stat: prices[stat][index]
+                for stat in ("count", "mean", "min", "median", "max")
+            },
+            "promo_depth_mean": depths["mean"][index],
+            "promo_depth_max": depths["max"][index],
+            "promo_share": promo_share[index],
+            "in_stock_share": stock_share[index],
+        }
+
+    whole = np.zeros(len(promo), dtype=np.int64)
+    total = _group_stats(promo, whole, 1)
+    summary = {
+        "products": len(promo),
+        "price_promo": {
+            stat: total[stat][0]
+            for stat in ("count", "mean", "min", "median", "max")
+        },
+        "promo_depth_mean": _group_stats(depth, whole, 1)["mean"][0],
+        "categories": categories,
+    }
+    if previous is not None:
+        summary["changes"] = price_changes(snapshot, previous)
+    return summary
+
+
+def write_analytics(
+    rows: list[list], header: list[str], snapshot_file: str, summary_file: str
+) -> dict:
+    """Строит снимок запуска, сравнивает с прошлым, пишет сводку в JSON.
+    Снимок запуска сохраняется вместо прошлого (snapshot_file -- .npz)
+    """
+    snapshot = build_snapshot(rows, header)
+    previous = load_snapshot(snapshot_file)
+    summary = summarize(snapshot, previous)
+
+    with open(summary_file, "w") as file:
+        json.dump(summary, file, ensure_ascii=False, indent=4)
+    save_snapshot(snapshot_file, merge_snapshots(snapshot, previous))
+    return summary
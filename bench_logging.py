@@ -0,0 +1,205 @@
+"""Бенчмарк: доля логирования во времени работы рабочих потоков.
+
+Эмулирует горячие циклы парсера (сообщение на каждую страницу, товар
+и паузу) в max_threads потоках и сравнивает:
+    - без логирования (базовое время работы);
+    - sync: как было -- f-строки, INFO на каждое событие, синхронная
+      запись в файлы и консоль из рабочих потоков;
+    - queue: те же сообщения, но через stuff.setup_queue_logging
+      (QueueHandler/QueueListener) -- эффект только очереди;
+    - queue+sampling: очередь и сообщения как в парсере сейчас --
+      ленивое форматирование и прореживание (stuff.LogSampler).
+
+Обработчики -- как в logging.conf, консоль заменена на файл, чтобы вывод
+бенчмарка оставался читаемым.
+Запуск из папки проекта: python bench_logging.py [кол-во товаров на поток]
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import sys
+import tempfile
+import threading
+from time import perf_counter, process_time, thread_time
+
+import stuff
+from stuff import LogSampler, logger, setup_queue_logging
+
+
+THREADS = 10
+PRODUCTS_PER_THREAD = 5000
+PAGE_SIZE = 100
+# как в config.json
+SAMPLING = {"pages": 10, "products": 100, "requests": 10, "sleeps": 100}
+
+
+def make_handlers(log_dir: str) -> list[logging.Handler]:
+    """Обработчики как в logging.conf"""
+    simple = logging.Formatter(
+        "%(asctime)s [%(levelname)s]: %(message)s", "%Y-%m-%d %H:%M:%S"
+    )
+    verbose = logging.Formatter(
+        "%(asctime)s [%(levelname)s] %(filename)s(%(lineno)d): %(message)s",
+        "%Y-%m-%d %H:%M:%S",
+    )
+    console = logging.FileHandler(os.path.join(log_dir, "console.log"), "w")
+    console.setLevel(logging.INFO)
+    console.setFormatter(simple)
+    full = logging.FileHandler(os.path.join(log_dir, "full.log"), "w")
+    full.setLevel(logging.DEBUG)
+    full.setFormatter(verbose)
+    errors = logging.FileHandler(os.path.join(log_dir, "errors.log"), "w")
+    errors.setLevel(logging.WARNING)
+    errors.setFormatter(verbose)
+    return [console, full, errors]
+
+
+def set_root_handlers(handlers: list[logging.Handler]) -> None:
+    """Заменяет обработчики корневого логгера, старые закрывает"""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    for handler in handlers:
+        root.addHandler(handler)
+
+
+def work() -> int:
+    """Полезная работа на один товар"""
+    return sum(i * i for i in range(200))
+
+
+def worker_plain(products: int) -> None:
+    for _ in range(products):
+        work()
+
+
+def worker_before(products: int) -> None:
+    """Сообщения парсера до перехода на очередь и прореживание"""
+    slug = "zubnye-pasty"
+    for number in range(products):
+        if number % PAGE_SIZE == 0:
+            logger.info(f"Request for {PAGE_SIZE} products from {slug}.")
+            logger.debug(f"url={'https://novex.ru/api/catalog/products'}")
+        logger.info(f"Sleep {0} seconds.")
+        work()
+        logger.info(
+            f"Product 'product-{number}' has been updated. "
+            + "Added attributes: {'country': 'Россия'}."
+        )
+
+
+def make_worker_after(sampler: LogSampler):
+    """Сообщения парсера сейчас: ленивые и прореженные sampler'ом"""
+
+    def worker_after(products: int) -> None:
+        slug = "zubnye-pasty"
+        for number in range(products):
+            if number % PAGE_SIZE == 0:
+                if sampler.should_log("requests"):
+                    logger.debug(
+                        "Request for %s products from %s starting at #%s, "
+                        + "url=%s",
+                        PAGE_SIZE,
+                        slug,
+                        number,
+                        "https://novex.ru/api/catalog/products",
+                    )
+                if sampler.should_log("pages"):
+                    logger.info("[%s] Got %s products.", slug, number)
+            if sampler.should_log("sleeps"):
+                logger.debug("Sleep %s seconds.", 0)
+            work()
+            if sampler.should_log("products"):
+                logger.info(
+                    "Enriched %s products. Last one: '%s', attributes: %s.",
+                    number + 1,
+                    f"product-{number}",
+                    {"country": "Россия"},
+                )
+
+    return worker_after
+
+
+def run_threads(worker, products: int) -> tuple:
+    """Запускает worker в THREADS потоках.
+    Возвращает (wall, cpu рабочих потоков, cpu процесса)
+    """
+    worker_cpu = []
+
+    def target() -> None:
+        started = thread_time()
+        worker(products)
+        worker_cpu.append(thread_time() - started)
+
+    threads = [threading.Thread(target=target) for _ in range(THREADS)]
+    wall_start, cpu_start = perf_counter(), process_time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (
+        perf_counter() - wall_start,
+        sum(worker_cpu),
+        process_time() - cpu_start,
+    )
+
+
+def stop_listener(listener: logging.handlers.QueueListener) -> None:
+    """Останавливает listener (дописывает хвост очереди).
+    Повторная остановка при выходе (atexit) больше не нужна
+    """
+    listener.stop()
+    atexit.unregister(listener.stop)
+
+
+def run_queued(worker, products: int, log_dir: str) -> tuple:
+    """worker с обработчиками в фоновом потоке, как в парсере"""
+    set_root_handlers(make_handlers(log_dir))
+    listener = setup_queue_logging()
+    try:
+        return run_threads(worker, products)
+    finally:
+        stop_listener(listener)
+        for handler in listener.handlers:
+            handler.close()
+
+
+def main():
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else PRODUCTS_PER_THREAD
+    # при импорте stuff логирование уже перенесено в очередь (logging.conf)
+    stop_listener(stuff.log_listener)
+    logging.getLogger().setLevel(logging.DEBUG)
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        set_root_handlers([])
+        results = {"no logs": run_threads(worker_plain, products)}
+
+        set_root_handlers(make_handlers(log_dir))
+        results["sync"] = run_threads(worker_before, products)
+        set_root_handlers([])
+
+        results["queue"] = run_queued(worker_before, products, log_dir)
+        results["queue+sampling"] = run_queued(
+            make_worker_after(LogSampler(SAMPLING)), products, log_dir
+        )
+        set_root_handlers([])
+
+    # доля логирования -- сверх базового CPU рабочих потоков
+    base_cpu = results["no logs"][1]
+    print(f"{THREADS} threads x {products} products")
+    print(
+        f"{'mode':<16}{'wall, s':>10}{'workers cpu, s':>16}"
+        + f"{'process cpu, s':>16}{'logging share':>16}"
+    )
+    for mode, (wall, workers_cpu, process_cpu) in results.items():
+        share = max(0.0, 1 - base_cpu / workers_cpu)
+        print(
+            f"{mode:<16}{wall:>10.2f}{workers_cpu:>16.2f}"
+            + f"{process_cpu:>16.2f}{share:>16.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Circuit breaker, общий для всех потоков процесса.
+
+Для каждого эндпоинта свой breaker. После failure_threshold ошибок подряд
+breaker размыкается (open) и все потоки ждут recovery_timeout секунд,
+затем пропускается один пробный запрос (half-open): при успехе работа
+возобновляется (closed), при ошибке breaker снова размыкается.
+"""
+import threading
+from time import monotonic
+
+from stuff import logger
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.state = CLOSED
+        self.failures = 0  # ошибок подряд
+        self.opened_at = 0.0
+        self.opens = 0  # сколько раз размыкался
+        self.probe_in_flight = False
+
+        self.condition = threading.Condition()
+
+    def _set_state(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(
+            f"Circuit breaker '{self.name}': {self.state} -> {state}."
+        )
+        self.state = state
+
+    def acquire(self) -> None:
+        """Ждёт, пока запрос к эндпоинту разрешён.
+        В состоянии half-open пропускает только один пробный запрос
+        """
+        with self.condition:
+            while True:
+                if self.state == CLOSED:
+                    return
+
+                reopen_at = self.opened_at + self.recovery_timeout
+                remaining = reopen_at - monotonic()
+                if self.state == OPEN and remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+
+                if not self.probe_in_flight:
+                    self._set_state(HALF_OPEN)
+                    self.probe_in_flight = True
+                    return
+
+                # пробный запрос уже отправлен другим потоком
+                self.condition.wait()
+
+    def record_success(self) -> None:
+        with self.condition:
+            self.failures = 0
+            self.probe_in_flight = False
+            self._set_state(CLOSED)
+            self.condition.notify_all()
+
+    def record_failure(self) -> None:
+        with self.condition:
+            self.failures += 1
+            threshold_reached = self.failures >= self.failure_threshold
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and threshold_reached
+            ):
+                self.opened_at = monotonic()
+                self.opens += 1
+                self.probe_in_flight = False
+                self._set_state(OPEN)
+                self.condition.notify_all()
+
+    def snapshot(self) -> dict:
+        """Состояние для логов и метрик"""
+        with self.condition:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "opens": self.opens,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Возвращает общий для процесса breaker эндпоинта name.
+    kwargs используются только при создании breaker'а
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **kwargs)
+        return _breakers[name]
+
+
+def breakers_snapshot() -> dict:
+    """Состояние всех breaker'ов процесса"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
@@ -0,0 +1,96 @@
+"""Кэш ответов в памяти процесса.
+
+LRU с ограничением по суммарному размеру ответов в байтах и
+single-flight: если значение по ключу уже запрашивается другим потоком,
+остальные потоки ждут этот запрос, а не идут в сеть повторно.
+Значения отдаются всем вызывающим как есть -- их нельзя изменять.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+class _Flight:
+    """Запрос значения, выполняемый одним из потоков"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlightLRU:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+
+        self.items = OrderedDict()  # {ключ: (значение, размер)}
+        self.flights = {}
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # запросы, дождавшиеся чужого запроса
+
+    def get_or_fetch(
+        self, key: str, fetch: Callable[[], tuple[Any, int]]
+    ) -> Any:
+        """Значение по ключу из кэша или от fetch.
+        fetch возвращает (значение, размер в байтах), размер None --
+        значение не кэшируется (например, запрос не удался)
+        """
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                self.hits += 1
+                return self.items[key][0]
+
+            flight = self.flights.get(key)
+            if flight is None:
+                flight = self.flights[key] = _Flight()
+                leader = True
+                self.misses += 1
+            else:
+                leader = False
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value, size = fetch()
+            flight.value = value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+                if flight.error is None and size is not None:
+                    self._put(key, value, size)
+            flight.done.set()
+
+        return value
+
+    def _put(self, key: str, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        self.items[key] = (value, size)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self.items.popitem(last=False)
+            self.current_bytes -= evicted_size
+
+    def snapshot(self) -> dict:
+        """Статистика для логов и метрик"""
+        with self.lock:
+            return {
+                "items": len(self.items),
+                "bytes": self.current_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
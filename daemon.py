@@ -0,0 +1,92 @@
+"""Расписание обновления категорий для режима демона.
+
+Каждая категория обновляется со своим интервалом. Интервал задаётся
+для категории или для любого её родителя, остальные категории
+обновляются с интервалом по умолчанию. Категории, которым одновременно
+пора обновляться, объединяются в один цикл; категория, которая уже
+обновляется, повторно в очередь не ставится, а пропущенные за время
+долгого цикла запуски схлопываются в один.
+"""
+from time import time
+
+
+def assign_intervals(
+    categories: list[dict],
+    intervals_min: dict[str, float],
+    default_min: float,
+) -> dict[str, float]:
+    """Интервалы обновления (в минутах) для категорий нижнего уровня.
+    Категория наследует интервал ближайшего родителя, для которого
+    он задан в intervals_min
+    """
+    result = {}
+
+    def walk(category: dict, inherited: float) -> None:
+        interval = intervals_min.get(category["slug"], inherited)
+        if category.get("children"):
+            for child in category["children"]:
+                walk(child, interval)
+        else:
+            result[category["slug"]] = interval
+
+    for category in categories:
+        walk(category, default_min)
+    return result
+
+
+class RefreshScheduler:
+    def __init__(self, intervals_min: dict[str, float]):
+        self.intervals_min = intervals_min
+        self.next_due = {}  # {slug: время следующего обновления}
+        self.running = set()
+
+    def update_intervals(self, intervals_min: dict[str, float]) -> None:
+        """Обновляет список категорий после перезапроса дерева.
+        Новые категории обновляются сразу, удалённые -- забываются
+        """
+        self.intervals_min = intervals_min
+        self.next_due = {
+            slug: due
+            for slug, due in self.next_due.items()
+            if slug in intervals_min
+        }
+
+    def take_due(self, now: float = None) -> list[str]:
+        """Категории, которым пора обновиться. Помечаются как выполняемые"""
+        now = time() if now is None else now
+        due = [
+            slug
+            for slug in self.intervals_min
+            if slug not in self.running and self.next_due.get(slug, 0) <= now
+        ]
+        self.running.update(due)
+        return due
+
+    def done(
+        self, slugs: list[str], retry_min: float = None, now: float = None
+    ) -> None:
+        """Отмечает категории обновлёнными. Следующее обновление --
+        через интервал категории от текущего момента, а при ошибке --
+        через retry_min минут
+        """
+        now = time() if now is None else now
+        for slug in slugs:
+            self.running.discard(slug)
+            if slug not in self.intervals_min:
+                continue
+            interval = (
+                self.intervals_min[slug] if retry_min is None else retry_min
+            )
+            self.next_due[slug] = now + interval * 60
+
+    def seconds_to_next(self, now: float = None) -> float:
+        """Сколько секунд до ближайшего обновления"""
+        now = time() if now is None else now
+        waiting = [
+            self.next_due.get(slug, 0)
+            for slug in self.intervals_min
+            if slug not in self.running
+        ]
+        if not waiting:
+            return None
+        return max(0.0, min(waiting) - now)
@@ -0,0 +1,42 @@
+"""Декодирование JSON из байтов ответа.
+
+Используется самый быстрый из установленных декодеров:
+orjson, ujson или стандартный json.
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # необязательная зависимость
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # необязательная зависимость
+    ujson = None
+
+
+if orjson is not None:
+    DECODER_NAME = "orjson"
+    _loads = orjson.loads
+elif ujson is not None:
+    DECODER_NAME = "ujson"
+    _loads = ujson.loads
+else:
+    DECODER_NAME = "json"
+    _loads = json.loads
+
+
+class MalformedJSONError(ValueError):
+    """Источник вернул некорректный JSON"""
+
+
+def decode_json(data: bytes) -> Any:
+    """Декодирует JSON прямо из байтов, без промежуточной строки.
+    Ошибки всех декодеров приводятся к MalformedJSONError
+    """
+    try:
+        return _loads(data)
+    except ValueError as e:  # в т.ч. UnicodeDecodeError и ошибки orjson
+        raise MalformedJSONError(f"{DECODER_NAME}: {e}") from e
@@ -0,0 +1,132 @@
+"""Пул выходных точек (HTTP-прокси) для запросов к источнику.
+
+У каждого прокси своя сессия (пул соединений), свой лимит запросов
+в секунду и оценка здоровья: сглаженные доля ошибок и задержка.
+Запрос уходит через самый здоровый прокси со свободным лимитом,
+прокси с большой долей ошибок временно исключаются (bench).
+"""
+import threading
+from time import monotonic, sleep
+from typing import Any, Callable
+
+from stuff import logger
+
+
+# штраф в оценке прокси за ошибки: столько секунд задержки при доле ошибок 1.
+# Не зависит от задержки -- прокси без единого успешного запроса (задержка 0)
+# не должен обгонять рабочие
+ERROR_PENALTY_S = 10.0
+
+
+class Egress:
+    def __init__(self, proxy: str, session: Any, rate_limit_rps: float):
+        self.proxy = proxy
+        self.session = session
+        self.session.proxies = {"http": proxy, "https": proxy}
+
+        # token bucket: не больше rate_limit_rps запросов в секунду
+        self.rate_limit_rps = rate_limit_rps
+        self.tokens = 1.0
+        self.refilled_at = monotonic()
+
+        self.error_rate = 0.0
+        self.latency = 0.0
+        self.requests = 0
+        self.benched_until = 0.0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(
+            max(self.rate_limit_rps, 1.0),
+            self.tokens + (now - self.refilled_at) * self.rate_limit_rps,
+        )
+        self.refilled_at = now
+
+    def score(self) -> float:
+        """Чем меньше, тем лучше"""
+        return (
+            self.latency * (1 + 10 * self.error_rate)
+            + self.error_rate * ERROR_PENALTY_S
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "error_rate": round(self.error_rate, 3),
+            "latency_s": round(self.latency, 3),
+            "benched": self.benched_until > monotonic(),
+        }
+
+
+class EgressPool:
+    def __init__(
+        self,
+        proxies: list[str],
+        session_factory: Callable[[], Any],
+        rate_limit_rps: float = 5,
+        bench_s: float = 60,
+        error_threshold: float = 0.5,
+        min_requests: int = 5,
+        smoothing: float = 0.2,
+    ):
+        if not proxies:
+            raise ValueError("Egress pool needs at least one proxy")
+
+        self.egresses = [
+            Egress(proxy, session_factory(), rate_limit_rps)
+            for proxy in proxies
+        ]
+        self.bench_s = bench_s
+        self.error_threshold = error_threshold
+        self.min_requests = min_requests
+        self.smoothing = smoothing
+        self.lock = threading.Lock()
+
+    def acquire(self) -> Egress:
+        """Ждёт прокси со свободным лимитом и возвращает самый здоровый.
+        Если исключены все прокси, ждёт возвращения первого из них
+        """
+        while True:
+            with self.lock:
+                now = monotonic()
+                for egress in self.egresses:
+                    egress.refill(now)
+
+                active = [e for e in self.egresses if e.benched_until <= now]
+                if not active:
+                    wait = min(e.benched_until for e in self.egresses) - now
+                else:
+                    ready = [e for e in active if e.tokens >= 1]
+                    if ready:
+                        egress = min(ready, key=Egress.score)
+                        egress.tokens -= 1
+                        return egress
+                    wait = min(
+                        (1 - e.tokens) / e.rate_limit_rps for e in active
+                    )
+            sleep(max(wait, 0.001))
+
+    def report(self, egress: Egress, ok: bool, latency: float) -> None:
+        """Учитывает результат запроса через egress"""
+        with self.lock:
+            egress.requests += 1
+            egress.error_rate += self.smoothing * (
+                (0.0 if ok else 1.0) - egress.error_rate
+            )
+            if ok:
+                egress.latency += self.smoothing * (latency - egress.latency)
+
+            if (
+                egress.requests >= self.min_requests
+                and egress.error_rate > self.error_threshold
+            ):
+                egress.benched_until = monotonic() + self.bench_s
+                # после возвращения прокси снова нужно несколько ошибок
+                egress.error_rate = self.error_threshold / 2
+                logger.warning(
+                    f"Egress '{egress.proxy}' benched for {self.bench_s}s."
+                )
+
+    def snapshot(self) -> dict:
+        """Состояние прокси для логов и метрик"""
+        with self.lock:
+            return {e.proxy: e.snapshot() for e in self.egresses}
@@ -41,3 +41,39 @@ def prepare_string(text: str) -> str:
 def prepare_row(row: list[str]) -> list:
     """готовит строку для записи в CSV"""
     return [prepare_string(el) if isinstance(el, str) else el for el in row]
+
+
+def extract_attributes(payload: dict, attributes: dict[str, str]) -> dict:
+    """Извлекает атрибуты товара из характеристик (characteristics).
+    attributes -- {ключ в товаре: код характеристики (productProp.code)}.
+    Возвращает {ключ: значение или None}. Если в payload характеристик нет
+    вообще, возвращает None -- атрибуты нужно брать из детального запроса.
+    """
+    if not payload or payload.get("characteristics") is None:
+        return None
+
+    values = {
+        characteristic["productProp"]["code"]: characteristic["value"]
+        for characteristic in payload["characteristics"]
+    }
+    return {key: values.get(code) for key, code in attributes.items()}
+
+
+def missing_attributes(attributes: dict, keys: dict[str, str]) -> bool:
+    """Нет ли среди attributes значения хотя бы для одного из keys"""
+    return attributes is None or any(
+        attributes.get(key) is None for key in keys
+    )
+
+
+def merge_attributes(attributes: dict, fallback: dict) -> dict:
+    """Атрибуты из attributes, недостающие (None) -- из fallback.
+    Если атрибутов нет ни там, ни там, возвращает None.
+    """
+    if attributes is None or fallback is None:
+        return attributes if fallback is None else fallback
+
+    return {
+        key: fallback.get(key) if value is None else value
+        for key, value in attributes.items()
+    }
@@ -0,0 +1,117 @@
+"""Хеджирование запросов для сокращения хвостовых задержек.
+
+Если запрос не ответил за время, равное заданному перцентилю задержек
+последних ответов, отправляется его дубликат и используется тот ответ,
+что пришёл первым. Задержки копятся отдельно для каждого эндпоинта
+(key): страницы листинга и запросы карточек товара отвечают по-разному.
+Кол-во дубликатов ограничено бюджетом: не больше доли budget от всех
+запросов, а перед отправкой дубликата выдерживается та же пауза (pace),
+что и перед обычным запросом, чтобы не превышать нагрузку на источник.
+"""
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import monotonic
+from typing import Any, Callable
+
+
+class Hedger:
+    def __init__(
+        self,
+        percentile: float = 95,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        max_workers: int = 20,
+        pace: Callable[[], None] = None,
+    ):
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.window = window
+        self.pace = pace
+
+        self.latencies = {}  # {key: deque последних задержек}
+        # токены на дубликаты: каждый запрос добавляет budget токена,
+        # дубликат расходует один
+        self.tokens = 0.0
+        self.max_tokens = max(1.0, budget * window)
+        self.hedged = 0
+        self.hedges_won = 0
+
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hedge"
+        )
+
+    def hedge_delay(self, key: str) -> float:
+        """Через сколько секунд отправлять дубликат запроса к key.
+        None -- статистики ещё недостаточно, хеджирование не применяется
+        """
+        with self.lock:
+            latencies = self.latencies.get(key, ())
+            if len(latencies) < self.min_samples:
+                return None
+            latencies = sorted(latencies)
+
+        index = round(self.percentile / 100 * (len(latencies) - 1))
+        return latencies[index]
+
+    def _record(self, key: str, latency: float) -> None:
+        with self.lock:
+            if key not in self.latencies:
+                self.latencies[key] = deque(maxlen=self.window)
+            self.latencies[key].append(latency)
+
+    def _take_token(self) -> bool:
+        """Списывает токен на дубликат, если бюджет позволяет"""
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self.hedged += 1
+            return True
+
+    def _timed(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        started = monotonic()
+        result = func(*args, **kwargs)
+        self._record(key, monotonic() - started)
+        return result
+
+    def _paced(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        """Дубликат: сначала пауза, как перед обычным запросом"""
+        if self.pace:
+            self.pace()
+        return self._timed(key, func, *args, **kwargs)
+
+    def call(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        """Вызывает func (запрос к эндпоинту key), при долгом ответе --
+        дублирует вызов. Возвращает первый успешный результат.
+        Если упали все вызовы, пробрасывает исключение последнего из них.
+        """
+        with self.lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.budget)
+
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return self._timed(key, func, *args, **kwargs)
+
+        primary = self.executor.submit(
+            self._timed, key, func, *args, **kwargs
+        )
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_token():
+            return primary.result()
+
+        hedge = self.executor.submit(self._paced, key, func, *args, **kwargs)
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self.lock:
+                            self.hedges_won += 1
+                    return future.result()
+            if not pending:
+                return future.result()  # пробрасывает исключение
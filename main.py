@@ -1,17 +1,40 @@
 import threading
 import json
+import time
 import requests
 import csv
 from datetime import datetime
 from typing import Callable
 
-from handlers import build_sku_category, prepare_row
+import analytics
+from breaker import breakers_snapshot, get_breaker
+from cache import SingleFlightLRU
+from daemon import RefreshScheduler, assign_intervals
+from decoders import MalformedJSONError, decode_json
+from egress import EgressPool
+from handlers import (
+    build_sku_category,
+    extract_attributes,
+    merge_attributes,
+    missing_attributes,
+    prepare_row,
+)
+from hedging import Hedger
+from pagination import page_for_window, split_limit, window_limit
+from progress import ProgressTracker
+from scheduling import CategoryHistory
+from storage import SQLiteStore
+from tuning import LimitTuner
+from writers import get_writer
 
 from stuff import (
+    LogSampler,
+    NoRetryError,
     logger,
     timer,
     request_repeater,
     restarter,
+    sleep_between_requests,
 )
 
 
@@ -19,10 +42,29 @@ RESULT_DIR = "results/"
 # файлы для сохранения результатов
 STRUCTURE_FILE = RESULT_DIR + "categories.csv"
 CATEGORIES_TO_PARSE = RESULT_DIR + "categories_to_parse.csv"
-PRODUCTS_FILE = RESULT_DIR + "products.csv"
+# расширение добавляется writer'ом в зависимости от формата
+PRODUCTS_FILE = RESULT_DIR + "products"
 
 CONFIG_FILE = "config.json"
 
+# колонки файла с товарами, порядок как в prepare_product_for_csv
+PRODUCTS_HEADER = [
+    # Тип данных - текст. Формат: “2023-06-01 08:17:33”
+    "price_datetime",
+    # Регулярная цена. число, 2 десятичных знака. Пример: 134.99
+    "price",
+    "price_promo",  # Акционная цена. число, 2 десятичных знака.
+    "sku_status",  # наличие товара. 1(0) - (не) в наличии. число.
+    "sku_instock",  # остаток товара в выбранной торговой точке
+    "sku_article",  # Артикул товара. текст. Пример: 4100242804
+    "sku_name",  # Наименование товара.
+    "sku_category",
+    "sku_brand",
+    "sku_country",
+    "sku_link",
+    "sku_images",  # Прямая ссылка на фотографию товара.
+]
+
 # endpoints and urls
 BASE_URL = "https://novex.ru/"
 CATALOG_URL = BASE_URL + "api/catalog/"
@@ -30,6 +72,14 @@ CATEGORIES_ENDPOINT = CATALOG_URL + "categories"
 PRODUCTS_ENDPOINT = CATALOG_URL + "products"
 
 
+def is_source_failure(error: requests.exceptions.RequestException) -> bool:
+    """Сбой источника или сети: нет ответа, 5xx или 429.
+    Остальные 4xx -- ошибка запроса (например, товар удалён)
+    """
+    status = getattr(error.response, "status_code", None)
+    return status is None or status >= 500 or status == 429
+
+
 class Parser:
     def __init__(self):
         self.config = self.__get_settings_from_config()
@@ -53,6 +103,96 @@ class Parser:
 
         self.lock = threading.Lock()
         self.threads = []
+        # категории, товары которых собраны не полностью
+        self.failed_categories = []
+
+        # общий пул соединений для всех запросов к источнику.
+        # Сохраняется при перезапуске через restarter (obj.__init__())
+        self.session = getattr(self, "session", None) or requests.Session()
+        # пул прокси: у каждого свои соединения, лимит и оценка здоровья.
+        # При перезапуске соединения старого пула закрываются
+        if getattr(self, "egress_pool", None):
+            for egress in self.egress_pool.egresses:
+                egress.session.close()
+        self.egress_pool = None
+        egress = self.config["egress"]
+        if egress["proxies"]:
+            self.egress_pool = EgressPool(
+                egress["proxies"],
+                session_factory=requests.Session,
+                rate_limit_rps=egress["rate_limit_rps"],
+                bench_s=egress["bench_s"],
+                error_threshold=egress["error_threshold"],
+            )
+        # ответы о товарах: повторные запросы того же URL не идут в сеть.
+        # Кэш сохраняется при перезапуске через restarter (obj.__init__())
+        detail_cache = getattr(self, "detail_cache", None)
+        if not self.config["detail_cache"]["enabled"]:
+            detail_cache = None
+        elif detail_cache is None:
+            detail_cache = SingleFlightLRU(
+                self.config["detail_cache"]["max_mb"] * 1024 * 1024
+            )
+        self.detail_cache = detail_cache
+        # категории нижнего уровня по slug, для режима демона
+        self.leaf_categories = {}
+
+        # счётчики прогресса, статус пишется в файл и отдаётся по HTTP
+        self.progress = ProgressTracker(
+            extra=lambda: {"circuit_breakers": breakers_snapshot()}
+        )
+
+        # частые сообщения рабочих потоков пишутся в лог выборочно
+        self.log_sampler = LogSampler(self.config["log_sampling"])
+
+        # автоподбор products_limit, если включен
+        self.limit_tuner = None
+        autotune = self.config["products_limit_autotune"]
+        if autotune["enabled"]:
+            self.limit_tuner = LimitTuner(
+                limits=autotune["limits"],
+                default=self.config["products_limit"],
+                state_file=autotune["state_file"],
+            )
+
+        # размеры категорий и время запросов из прошлых запусков
+        self.category_history = CategoryHistory(
+            self.config["category_history_file"]
+        )
+
+        # дублирование запросов, которые отвечают дольше обычного.
+        # Hedger (и пул его потоков) сохраняется при перезапуске
+        hedger = getattr(self, "hedger", None)
+        hedging = self.config["hedging"]
+        if not hedging["enabled"]:
+            if hedger:
+                hedger.executor.shutdown(wait=False)
+            hedger = None
+        elif hedger is None:
+            hedger = Hedger(
+                percentile=hedging["percentile"],
+                budget=hedging["budget"],
+                min_samples=hedging["min_samples"],
+                max_workers=self.config["max_threads"] * 2,
+                # дубликат выдерживает ту же паузу, что и запрос
+                pace=lambda: sleep_between_requests(
+                    self.config["delay_range_s"],
+                    log=self.log_sampler.should_log("sleeps"),
+                ),
+            )
+        self.hedger = hedger
+
+        # опциональное хранилище результатов в SQLite. При перезапуске
+        # через restarter буфер старого хранилища записывается в базу
+        if getattr(self, "store", None):
+            self.store.close()
+        self.store = None
+        if self.config["sqlite"]["enabled"]:
+            self.store = SQLiteStore(
+                path=self.config["sqlite"]["path"],
+                shop_id=self.config["shop_id"],
+                batch_size=self.config["sqlite"]["batch_size"],
+            )
 
     def __get_settings_from_config(self) -> dict:
         """Получает настройки из конфигурационного файла"""
@@ -65,29 +205,108 @@ class Parser:
             )
             raise
 
-    @request_repeater
-    def fetch_json_data(self, url: str) -> dict:
-        """Получает данные из источника"""
+    @staticmethod
+    def _endpoint(url: str) -> str:
+        """Эндпоинт для circuit breaker'а: URL без параметров,
+        запросы информации о разных товарах -- один эндпоинт
+        """
+        endpoint = url.split("?")[0]
+        if endpoint.startswith(PRODUCTS_ENDPOINT + "/"):
+            return PRODUCTS_ENDPOINT + "/{slug}"
+        return endpoint
+
+    def _get(self, url: str) -> requests.Response:
+        """GET-запрос к источнику. Ответ с кодом ошибки -- исключение.
+        Если задан пул прокси, запрос идёт через самый здоровый из них
+        """
+        if not self.egress_pool:
+            response = self.session.get(
+                url=url,
+                headers=self.config["headers"],
+                timeout=self.config["request_timeout"],
+            )
+            response.raise_for_status()
+            return response
+
+        egress = self.egress_pool.acquire()
+        started = time.monotonic()
         try:
-            response = requests.get(
+            response = egress.session.get(
                 url=url,
                 headers=self.config["headers"],
                 timeout=self.config["request_timeout"],
             )
             response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            # ответ 4xx (кроме 429) -- прокси исправен
+            self.egress_pool.report(
+                egress, not is_source_failure(e), time.monotonic() - started
+            )
+            raise
+        self.egress_pool.report(egress, True, time.monotonic() - started)
+        return response
 
-            return response.json()
+    @request_repeater
+    def fetch_json_data(
+        self, url: str, split_malformed: bool = False, with_size: bool = False
+    ) -> dict:
+        """Получает данные из источника.
+        split_malformed -- при некорректном JSON не повторять тот же запрос,
+        а выбросить NoRetryError, чтобы вызывающий код раздробил страницу.
+        with_size -- вернуть (данные, размер ответа в байтах).
+        """
+        # общий для всех потоков breaker: при сбоях источника ждут все
+        settings = self.config["circuit_breaker"]
+        breaker = get_breaker(
+            self._endpoint(url),
+            failure_threshold=settings["failure_threshold"],
+            recovery_timeout=settings["recovery_timeout_s"],
+        )
+        breaker.acquire()
+
+        try:
+            if self.hedger:
+                response = self.hedger.call(
+                    self._endpoint(url), self._get, url
+                )
+            else:
+                response = self._get(url)
 
         except requests.exceptions.RequestException as e:
-            logger.error(f"Error making request to {url}: {e}")
+            if is_source_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            logger.error("Error making request to %s: %s", url, e)
             raise
 
+        except BaseException:
+            # результат нужно записать при любой ошибке, иначе пробный
+            # запрос half-open не завершится и остальные потоки зависнут
+            breaker.record_failure()
+            raise
+
+        breaker.record_success()
+
+        try:
+            data = decode_json(response.content)
+        except MalformedJSONError as e:
+            logger.error("Malformed JSON from %s: %s", url, e)
+            if split_malformed:
+                raise NoRetryError(str(e)) from e
+            raise
+
+        if with_size:
+            return data, len(response.content)
+        return data
+
     def _get_categories(self) -> None:
         """Получает все категории и все подкатегории"""
         logger.info("Getting all categories and subcategories.")
 
         url = CATEGORIES_ENDPOINT + "?withChildren=true"
-        response = requests.get(url=url, headers=self.config["headers"])
+        response = self.session.get(url=url, headers=self.config["headers"])
         response.raise_for_status()
 
         self.all_categories = response.json()
@@ -128,7 +347,15 @@ class Parser:
             + f"&shopIds[]={self.config['shop_id']}"
         )
 
-        return self.fetch_json_data(url)
+        if not self.detail_cache:
+            return self.fetch_json_data(url)
+
+        def fetch() -> tuple[dict, int]:
+            result = self.fetch_json_data(url, with_size=True)
+            # исчерпаны попытки (False) -- не кэшируем
+            return result if result else (result, None)
+
+        return self.detail_cache.get_or_fetch(url, fetch)
 
     def __add_receiving_time(self, response: dict) -> dict:
         """записывает время получения данных о продукте в items"""
@@ -136,6 +363,85 @@ class Parser:
             item["receiving_time"] = datetime.now()
         return response
 
+    def _products_url(self, category: dict, page: int, limit: int) -> str:
+        """URL страницы товаров категории"""
+        return (
+            f"{PRODUCTS_ENDPOINT}?"
+            + f"categoryIdOrSlug={category['slug']}"
+            + f"&contextCityId={self.config['city_id']}"
+            + f"&deliveryType={self.config['method']}"
+            + f"&shopIds[]={self.config['shop_id']}"
+            + f"&page={page}"
+            + f"&limit={limit}"
+            + self.config["products_extra_params"]
+        )
+
+    def _choose_products_limit(self, category: dict) -> int:
+        """Размер страницы для очередного запроса товаров категории"""
+        if self.limit_tuner:
+            return self.limit_tuner.choose(category["slug"])
+        return self.config["products_limit"]
+
+    def _fetch_products_window(
+        self, category: dict, offset: int, limit: int
+    ) -> dict:
+        """Получает товары категории в окне [offset, offset + limit).
+
+        Если источник вернул некорректный JSON, окно не запрашивается
+        повторно целиком, а дробится на более мелкие окна (см. split_limit).
+        Возвращает {"items": [...], "pagination": {...} или None},
+        для раздробленного окна дополнительно "malformed": True.
+        None -- окно не получено: исчерпаны попытки запроса.
+        """
+        url = self._products_url(
+            category, page_for_window(offset, limit), limit
+        )
+        if self.log_sampler.should_log("requests"):
+            logger.debug(
+                "Request for %s products from %s starting at #%s, url=%s",
+                limit,
+                category["slug"],
+                offset,
+                url,
+            )
+
+        try:
+            response = self.fetch_json_data(url, split_malformed=True)
+        except NoRetryError:
+            if limit == 1:
+                logger.error(
+                    f"[{category['slug']}] Product #{offset} skipped: "
+                    + "malformed JSON even for a single item."
+                )
+                return {"items": [], "pagination": None}
+
+            sub_limit = split_limit(limit)
+            logger.warning(
+                f"[{category['slug']}] Splitting window {offset}+{limit} "
+                + f"into windows of {sub_limit}."
+            )
+
+            items = []
+            pagination = None
+            for sub_offset in range(offset, offset + limit, sub_limit):
+                if pagination and sub_offset >= pagination["total"]:
+                    break
+                sub_response = self._fetch_products_window(
+                    category, sub_offset, sub_limit
+                )
+                if sub_response is None:
+                    return None
+                items.extend(sub_response["items"])
+                pagination = pagination or sub_response["pagination"]
+
+            return {
+                "items": items,
+                "pagination": pagination,
+                "malformed": True,
+            }
+
+        return response or None  # False -- исчерпаны попытки
+
     def _get_products_thread(self) -> None:
         """
         Получаем продукты из категорий categories.
@@ -145,7 +451,8 @@ class Parser:
 
         без параметра limit выдаётся 50 товаров
         ограничений на limit не видел, но увеличивается вероятность
-        "кривого" json.
+        "кривого" json. Страницы с некорректным json перезапрашиваются
+        окнами меньшего размера (см. _fetch_products_window).
         без параметра page выдаются только товары
 
         с параметром page выдаёт два ключа:
@@ -166,71 +473,127 @@ class Parser:
             category = self.categories_to_parse.pop(0)
             self.lock.release()
 
-            logger.info(f"Getting products for '{category['slug']}'")
+            try:
+                if not self._get_category_products(category):
+                    self._category_failed(category, "products not received")
+            except Exception as e:
+                self._category_failed(category, e)
 
-            page = 0
-            while True:
-                page += 1
+            self.progress.incr("categories_done")
 
-                logger.info(
-                    f"Request #{page} for {self.config['products_limit']} "
-                    + f"products from {category['slug']}."
-                )
+    def _get_category_products(self, category: dict) -> bool:
+        """Собирает товары категории постранично.
+        False -- окно товаров не получено (исчерпаны попытки)
+        """
+        logger.info("Getting products for '%s'", category["slug"])
+
+        offset = 0
+        total = None
+        while total is None or offset < total:
+            chosen_limit = self._choose_products_limit(category)
+            limit = window_limit(offset, chosen_limit)
+
+            started = time.monotonic()
+            response = self._fetch_products_window(category, offset, limit)
+            elapsed = time.monotonic() - started
+            if response is None:
+                return False
+
+            response = self.__add_receiving_time(response)
+
+            self.products.extend(response["items"])
+            offset += limit
+            self.progress.incr("pages_done")
+            self.progress.incr("products_listed", len(response["items"]))
+            self.category_history.record_page(
+                category["slug"], len(response["items"]), elapsed
+            )
 
-                url = (
-                    f"{PRODUCTS_ENDPOINT}?"
-                    + f"categoryIdOrSlug={category['slug']}"
-                    + f"&contextCityId={self.config['city_id']}"
-                    + f"&deliveryType={self.config['method']}"
-                    + f"&shopIds[]={self.config['shop_id']}"
-                    + f"&page={page}"
-                    + f"&limit={self.config['products_limit']}"
+            # не учитываем неполную последнюю страницу (занижает скорость)
+            # и окно, уменьшенное window_limit: это не тот размер,
+            # что выбрал tuner
+            malformed = response.get("malformed", False)
+            if (
+                self.limit_tuner
+                and limit == chosen_limit
+                and (malformed or len(response["items"]) == limit)
+            ):
+                self.limit_tuner.record(
+                    category["slug"],
+                    limit,
+                    len(response["items"]),
+                    elapsed,
+                    malformed,
                 )
-                logger.debug(f"{url=}")
-                response = self.fetch_json_data(url)
 
-                response = self.__add_receiving_time(response)
+            if total is None:
+                if not response["pagination"]:
+                    logger.error(
+                        f"[{category['slug']}] Pagination is unknown. "
+                        + "Category skipped."
+                    )
+                    return False
 
-                self.products.extend(response["items"])
+                total = response["pagination"]["total"]
+                self.progress.incr("products_total", total)
+                self.category_history.record_total(category["slug"], total)
+                logger.info("[%s] Total items: %s", category["slug"], total)
+                logger.info(
+                    "[%s] Total pages: %s",
+                    category["slug"],
+                    response["pagination"]["pages"],
+                )
 
-                if page == 1:
-                    logger.info(
-                        f"[{category['slug']}] "
-                        + f"Total items: {response['pagination']['total']}"
-                    )
-                    logger.info(
-                        f"[{category['slug']}] "
-                        + f"Total pages: {response['pagination']['pages']}"
-                    )
+            if self.log_sampler.should_log("pages"):
+                logger.info(
+                    "[%s] Got %s of %s products.",
+                    category["slug"],
+                    min(offset, total),
+                    total,
+                )
+        return True
 
-                if (
-                    response["pagination"]["page"]
-                    == response["pagination"]["pages"]
-                ):
-                    break
+    def _category_failed(self, category: dict, error) -> None:
+        """Запоминает категорию, товары которой собраны не полностью"""
+        logger.error(f"[{category['slug']}] Category failed: {error}")
+        with self.lock:
+            self.failed_categories.append(category["slug"])
 
     def _enrich_product(self, product: dict) -> None:
-        """Обогощает данные о продукте.
-        В данном случае добавляется только страна производства товара.
+        """Обогощает данные о продукте атрибутами из config["attributes"]
+        (по умолчанию -- страна производства товара).
+        Детальный запрос делается, только если в данных листинга
+        нет значения хотя бы одного из атрибутов.
         """
-        product["country"] = None
+        attributes = extract_attributes(product, self.config["attributes"])
 
-        response = self.get_product_info(product)
-        if "characteristics" not in response:
-            logger.warning(f"characteristics not found for {product['slug']}")
-            return
+        if missing_attributes(attributes, self.config["attributes"]):
+            response = self.get_product_info(product)
+            attributes = merge_attributes(
+                attributes,
+                extract_attributes(response, self.config["attributes"]),
+            )
 
-        for characteristic in response["characteristics"]:
-            if characteristic["productProp"]["code"] == "country":
-                product["country"] = characteristic["value"]
-                logger.info(
-                    f"Product '{product['slug']}' has been updated. "
-                    + f"Added country: '{product['country']}'."
-                )
-                break
+        if attributes is None:
+            logger.warning("characteristics not found for %s", product["slug"])
+            return
 
+        product.update(attributes)
         self.enriched_products.append(product)
 
+        # вместо сообщения на каждый товар -- одно на каждые N товаров
+        if self.log_sampler.should_log("products"):
+            logger.info(
+                "Enriched %s products. Last one: '%s', attributes: %s.",
+                len(self.enriched_products),
+                product["slug"],
+                attributes,
+            )
+
+        if self.store:
+            row = self.prepare_product_for_csv(product)
+            self.store.add_product(dict(zip(self.products_header, row)))
+
     def _enrich_products_thread(self) -> None:
         """Отдельный поток обогощения данных о продукте"""
         while True:
@@ -242,6 +605,7 @@ class Parser:
             self.lock.release()
 
             self._enrich_product(product)
+            self.progress.incr("products_enriched")
 
     def _create_categories_for_csv(self, categories: list) -> None:
         """Подготавливает данные для заданных категорий перед записью в файл.
@@ -282,7 +646,7 @@ class Parser:
             )
         except (TypeError, IndexError) as e:
             logger.warning(
-                f"{product['slug']} Image isn't presented. Error: {e}"
+                "%s Image isn't presented. Error: %s", product["slug"], e
             )
 
             product_image_link = None
@@ -296,7 +660,7 @@ class Parser:
 
         sku_country = product["country"] if "country" in product else None
 
-        product = [
+        product_row = [
             product["receiving_time"].strftime("%Y-%m-%d %H:%M:%S"),
             float(product["price"]["basePrice"]),
             float(product["price"]["price"]),
@@ -310,30 +674,27 @@ class Parser:
             product_url,
             product_image_link,
         ]
-        product = prepare_row(product)
+        # дополнительные атрибуты -- в конце строки, см. products_header
+        product_row.extend(product.get(key) for key in self.extra_attributes)
+
+        return prepare_row(product_row)
 
-        return product
+    @property
+    def extra_attributes(self) -> list[str]:
+        """Атрибуты из config["attributes"], кроме страны (sku_country).
+        Для них в конце файла с товарами добавляются колонки sku_<ключ>
+        """
+        return [key for key in self.config["attributes"] if key != "country"]
+
+    @property
+    def products_header(self) -> list[str]:
+        """Колонки файла с товарами"""
+        extra_columns = [f"sku_{key}" for key in self.extra_attributes]
+        return PRODUCTS_HEADER + extra_columns
 
     def _prepare_products_for_csv(self, products: list[list]) -> None:
         """подготавливает данные о товарах для сохранения в CSV"""
-        self.data_to_save = [
-            [
-                # Тип данных - текст. Формат: “2023-06-01 08:17:33”
-                "price_datetime",
-                # Регулярная цена. число, 2 десятичных знака. Пример: 134.99
-                "price",
-                "price_promo",  # Акционная цена. число, 2 десятичных знака.
-                "sku_status",  # наличие товара. 1(0) - (не) в наличии. число.
-                "sku_instock",  # остаток товара в выбранной торговой точке
-                "sku_article",  # Артикул товара. текст. Пример: 4100242804
-                "sku_name",  # Наименование товара.
-                "sku_category",
-                "sku_brand",
-                "sku_country",
-                "sku_link",
-                "sku_images",  # Прямая ссылка на фотографию товара.
-            ],
-        ]
+        self.data_to_save = [self.products_header]
 
         for product in products:
             prepared_product = self.prepare_product_for_csv(product)
@@ -351,6 +712,41 @@ class Parser:
             writer = csv.writer(file, delimiter=";")
             writer.writerows(self.data_to_save)
 
+    def _save_products(self, products_file: str) -> None:
+        """Сохраняет товары из self.data_to_save во всех форматах,
+        заданных в output_formats
+        """
+        for output_format in self.config["output_formats"]:
+            writer = get_writer(output_format)
+            filename = writer(products_file, self.data_to_save)
+            logger.info(f"Products saved to '{filename}'.")
+
+    def _write_analytics(self) -> None:
+        """Сводка цен по self.data_to_save и сравнение с прошлым запуском"""
+        settings = self.config["analytics"]
+        if not settings["enabled"]:
+            return
+        if analytics.np is None:
+            logger.warning("Price analytics skipped: numpy is not installed.")
+            return
+
+        # сбой аналитики (например, несовместимый снимок прошлого запуска)
+        # не должен приводить к перезапуску всего парсинга
+        try:
+            summary = analytics.write_analytics(
+                self.data_to_save[1:],  # первая строка -- заголовки
+                self.products_header,
+                settings["snapshot_file"],
+                settings["summary_file"],
+            )
+        except Exception as e:
+            logger.error(f"Exception in: _write_analytics: {e}")
+            return
+        logger.info(
+            f"Price analytics saved to '{settings['summary_file']}', "
+            + f"changes: {summary.get('changes')}."
+        )
+
     def start_multithreading(self, func: Callable) -> None:
         """Запускает функцию в многопоточном режиме.
         Функция должна иметь обеспечение синхронизации
@@ -366,28 +762,56 @@ class Parser:
 
     @restarter
     def run(self) -> None:
-        """Запускает полный цикл парсинга."""
-
-        logger.info("Parsing started.")
-
-        self._get_categories()  # получает все каталоги и подкаталоги, 1 запрос
-
-        # обход полученного дерева категорий для получения категорий самого
-        # нижнего уровня, которые и будут парситься.
-        self._bypass_categories()
-
+        """Запускает полный цикл парсинга.
+        Если включено, параллельно пишет статус прогресса.
+        """
+        settings = self.config["progress"]
+        if settings["enabled"]:
+            self.progress.start_reporting(
+                settings["status_file"],
+                settings["interval_s"],
+                settings["http_port"],
+            )
+        try:
+            self._parse()
+        finally:
+            self.progress.set_phase("finished")
+            if settings["enabled"]:
+                self.progress.stop_reporting(settings["status_file"])
+
+    def _save_categories(self) -> None:
+        """Сохраняет полный список категорий и список категорий для парсинга"""
+        self.data_to_save = []
         self._create_categories_for_csv(self.all_categories)
         self._save_to_csv(STRUCTURE_FILE)  # сохраняет полный список категорий
+        if self.store:
+            # первая строка -- заголовки
+            self.store.save_categories(self.data_to_save[1:])
         self.data_to_save = []
 
         self._create_categories_for_csv(self.categories_to_parse)
         # сохраняет категории, продукты из которых будут в результатах
         self._save_to_csv(CATEGORIES_TO_PARSE)
 
+    def _parse_products(self, products_file: str) -> None:
+        """Сбор и обогащение товаров из self.categories_to_parse,
+        сохранение результатов в products_file (без расширения)
+        """
+        # самые долгие по прошлым запускам категории -- в начало очереди,
+        # чтобы большая категория не досталась потоку в самом конце
+        self.categories_to_parse = self.category_history.order(
+            self.categories_to_parse
+        )
+        self.progress.incr("categories_total", len(self.categories_to_parse))
+        self.progress.set_phase("listing")
+
         # парсим продукты из категорий self.categories_to_parse
         # в моногопоточном режиме. на каждую категорию 1 поток
         logger.info("Products mining is starting.")
         self.start_multithreading(self._get_products_thread)
+        self.category_history.save()
+        if self.limit_tuner:
+            self.limit_tuner.save()
 
         # обогощаем данные о товаре. Многопочный режим.
         # Каждый товар в своём потоке. Кол-во запросов =
@@ -396,21 +820,164 @@ class Parser:
             "Products enrich is starting for "
             + f"{len(self.products)} products."
         )
+        self.progress.incr("enrich_total", len(self.products))
+        self.progress.set_phase("enrich")
         self.start_multithreading(self._enrich_products_thread)
+        self.progress.set_phase("saving")
 
         self._prepare_products_for_csv(self.enriched_products)
-        self._save_to_csv(PRODUCTS_FILE)
+        self._save_products(products_file)
+
+        if self.store:
+            self.store.flush()
+
+        self._write_analytics()
+
+        if self.hedger:
+            logger.info(
+                f"Hedged {self.hedger.hedged} requests, "
+                + f"{self.hedger.hedges_won} hedges answered first."
+            )
+
+        logger.info(f"Circuit breakers: {breakers_snapshot()}")
+        if self.egress_pool:
+            logger.info(f"Egress pool: {self.egress_pool.snapshot()}")
+        if self.detail_cache:
+            logger.info(f"Detail cache: {self.detail_cache.snapshot()}")
+
+    def _parse(self) -> None:
+        """Полный цикл парсинга."""
+
+        logger.info("Parsing started.")
+
+        self._get_categories()  # получает все каталоги и подкаталоги, 1 запрос
+
+        # обход полученного дерева категорий для получения категорий самого
+        # нижнего уровня, которые и будут парситься.
+        self._bypass_categories()
+
+        self._save_categories()
+
+        self._parse_products(PRODUCTS_FILE)
 
         logger.info("Parsing successfully finished.")
 
         # first row of CSV has headers of columns
         logger.info(f"Parsed {len(self.data_to_save) - 1} products.")
 
+    def _refresh_categories(self, scheduler: RefreshScheduler) -> None:
+        """Перезапрашивает дерево категорий и обновляет расписание"""
+        self.all_categories = []
+        self.categories_to_parse = []
+        self._get_categories()
+        self._bypass_categories()
+        self._save_categories()
+
+        self.leaf_categories = {c["slug"]: c for c in self.categories_to_parse}
+        settings = self.config["daemon"]
+        intervals = assign_intervals(
+            self.all_categories,
+            {
+                slug.replace("/", ""): interval
+                for slug, interval in settings["intervals_min"].items()
+            },
+            settings["default_interval_min"],
+        )
+        scheduler.update_intervals(
+            {
+                slug: interval
+                for slug, interval in intervals.items()
+                if slug in self.leaf_categories
+            }
+        )
+        logger.info(
+            f"Daemon schedule updated: {len(self.leaf_categories)} categories."
+        )
+
+    def _run_cycle(self, slugs: list[str]) -> list[str]:
+        """Обновляет товары заданных категорий. Результаты сохраняются
+        в файл товаров с датой и временем цикла в имени.
+        Возвращает категории, товары которых собраны не полностью
+        """
+        self.products = []
+        self.enriched_products = []
+        self.data_to_save = []
+        self.threads = []
+        self.failed_categories = []
+        self.categories_to_parse = [self.leaf_categories[s] for s in slugs]
+        # статус и ETA -- по текущему циклу, фоновая запись продолжается
+        self.progress.reset()
+
+        logger.info(f"Daemon cycle started for {len(slugs)} categories.")
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._parse_products(f"{PRODUCTS_FILE}_{stamp}")
+        logger.info(
+            "Daemon cycle finished. "
+            + f"Parsed {len(self.data_to_save) - 1} products, "
+            + f"{len(self.failed_categories)} categories failed."
+        )
+        return self.failed_categories
+
+    def run_daemon(self) -> None:
+        """Режим демона. Вместо перезапуска всего парсинга процесс работает
+        постоянно: соединения, кэши и статистика сохраняются между циклами,
+        категории обновляются по расписанию из config["daemon"].
+        При ошибке цикла его категории (или только неудавшиеся категории)
+        повторяются через restart_interval_min минут.
+        """
+        settings = self.config["daemon"]
+        progress = self.config["progress"]
+        retry_min = self.config["restart"]["restart_interval_min"]
+        if progress["enabled"]:
+            self.progress.start_reporting(
+                progress["status_file"],
+                progress["interval_s"],
+                progress["http_port"],
+            )
+
+        scheduler = RefreshScheduler({})
+        tree_refresh_at = 0.0
+        try:
+            while True:
+                if time.time() >= tree_refresh_at:
+                    try:
+                        self._refresh_categories(scheduler)
+                        tree_refresh_at = (
+                            time.time() + settings["tree_refresh_min"] * 60
+                        )
+                    except Exception as e:
+                        logger.error(f"Exception in: run_daemon: {e}")
+                        time.sleep(retry_min * 60)
+                        continue
+
+                due = scheduler.take_due()
+                if not due:
+                    self.progress.set_phase("waiting")
+                    wait = scheduler.seconds_to_next()
+                    if wait is None or wait > settings["tick_s"]:
+                        wait = settings["tick_s"]
+                    time.sleep(wait)
+                    continue
+
+                try:
+                    failed = self._run_cycle(due)
+                    scheduler.done([s for s in due if s not in failed])
+                    scheduler.done(failed, retry_min=retry_min)
+                except Exception as e:
+                    logger.error(f"Exception in: run_daemon: {e}")
+                    scheduler.done(due, retry_min=retry_min)
+        finally:
+            if progress["enabled"]:
+                self.progress.stop_reporting(progress["status_file"])
+
 
 @timer
 def main():
     parser = Parser()
-    parser.run()
+    if parser.config["daemon"]["enabled"]:
+        parser.run_daemon()
+    else:
+        parser.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+"""Математика окон при постраничном запросе товаров.
+
+Источник принимает page и limit, поэтому окно товаров
+[offset, offset + limit) можно запросить, только если offset кратен limit:
+page = offset // limit + 1.
+"""
+import math
+
+
+def page_for_window(offset: int, limit: int) -> int:
+    """Номер страницы для окна [offset, offset + limit)"""
+    if offset % limit:
+        raise ValueError(f"{offset=} is not a multiple of {limit=}")
+    return offset // limit + 1
+
+
+def window_limit(offset: int, limit: int) -> int:
+    """Размер окна, начинающегося с offset, не больше limit.
+    Если limit поменялся между страницами и offset ему не кратен,
+    окно уменьшается до НОД(offset, limit), чтобы снова выровняться.
+    """
+    if offset % limit == 0:
+        return limit
+    return math.gcd(offset, limit)
+
+
+def split_limit(limit: int) -> int:
+    """Размер окон, на которые дробится окно размером limit.
+    Наибольший собственный делитель limit, чтобы под-окна
+    ровно покрывали исходное окно и оставались выровненными.
+    """
+    if limit <= 1:
+        raise ValueError(f"Window of {limit=} can't be split")
+
+    for divisor in range(2, int(limit**0.5) + 1):
+        if limit % divisor == 0:
+            return limit // divisor
+    return 1
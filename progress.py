@@ -0,0 +1,187 @@
+"""Прогресс парсинга: сколько сделано, текущая скорость и ETA.
+
+Рабочие потоки увеличивают только свои счётчики (без общих блокировок),
+фоновый поток периодически суммирует их, считает скорость и ETA,
+пишет статус в JSON-файл и, если задан порт, отдаёт его по HTTP.
+"""
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic
+from typing import Callable
+
+
+# {название: (счётчик выполненного, счётчик общего кол-ва)}
+PROGRESS_ITEMS = {
+    "categories": ("categories_done", "categories_total"),
+    "pages": ("pages_done", None),
+    "products": ("products_listed", "products_total"),
+    "enrich": ("products_enriched", "enrich_total"),
+}
+
+# за какой период считается текущая скорость, секунд
+RATE_WINDOW_S = 60
+
+
+class ProgressTracker:
+    def __init__(self, extra: Callable[[], dict] = None):
+        # extra -- дополнительные данные для статуса (например, breakers)
+        self.extra = extra
+
+        self.local = threading.local()
+        self.thread_counters = []
+        self.generation = 0  # меняется при reset()
+        self.registry_lock = threading.Lock()
+
+        self.phase = "starting"
+        self.started_at = monotonic()
+        self.history = deque()  # [(время, {счётчик: значение}), ...]
+        self.status = {}
+        self.snapshot_lock = threading.Lock()
+
+        self.stop_event = threading.Event()
+        self.reporter = None
+        self.server = None
+
+    def incr(self, name: str, value: int = 1) -> None:
+        """Увеличивает счётчик name текущего потока"""
+        counters = getattr(self.local, "counters", None)
+        if counters is None or self.local.generation != self.generation:
+            counters = self.local.counters = {}
+            self.local.generation = self.generation
+            # только при первом обращении потока после reset()
+            with self.registry_lock:
+                self.thread_counters.append(counters)
+        counters[name] = counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        """Обнуляет счётчики, скорость и время (новый цикл демона).
+        Вызывается, когда рабочие потоки не считают
+        """
+        with self.registry_lock:
+            self.generation += 1
+            self.thread_counters = []
+        with self.snapshot_lock:
+            self.history.clear()
+            self.started_at = monotonic()
+
+    def set_phase(self, phase: str) -> None:
+        self.phase = phase
+
+    def totals(self) -> dict:
+        """Сумма счётчиков всех потоков"""
+        with self.registry_lock:
+            thread_counters = list(self.thread_counters)
+
+        totals = {}
+        for counters in thread_counters:
+            for name, value in list(counters.items()):
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def snapshot(self) -> dict:
+        """Статус: выполнено, всего, скорость в секунду и ETA в секундах"""
+        with self.snapshot_lock:
+            now = monotonic()
+            totals = self.totals()
+
+            self.history.append((now, totals))
+            while now - self.history[0][0] > RATE_WINDOW_S:
+                self.history.popleft()
+            past_time, past_totals = self.history[0]
+
+        status = {
+            "phase": self.phase,
+            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "elapsed_s": round(now - self.started_at, 1),
+        }
+        for item, (done_name, total_name) in PROGRESS_ITEMS.items():
+            done = totals.get(done_name, 0)
+            total = totals.get(total_name) if total_name else None
+
+            rate = None
+            if now > past_time:
+                rate = (done - past_totals.get(done_name, 0)) / (
+                    now - past_time
+                )
+
+            eta = None
+            if total is not None and rate:
+                eta = round(max(total - done, 0) / rate, 1)
+
+            status[item] = {
+                "done": done,
+                "total": total,
+                "rate_per_s": None if rate is None else round(rate, 2),
+                "eta_s": eta,
+            }
+
+        if self.extra:
+            status.update(self.extra())
+
+        self.status = status
+        return status
+
+    def write_status(self, filename: str) -> None:
+        """Записывает статус в файл целиком (через временный файл)"""
+        tmp_filename = filename + ".tmp"
+        with open(tmp_filename, "w") as file:
+            json.dump(self.snapshot(), file, indent=4)
+        os.replace(tmp_filename, filename)
+
+    def start_reporting(
+        self, filename: str, interval_s: float, http_port: int = None
+    ) -> None:
+        """Запускает фоновую запись статуса и, если задан порт, HTTP-сервер
+        на 127.0.0.1, отдающий статус в JSON
+        """
+        self.stop_event.clear()
+
+        def report() -> None:
+            while not self.stop_event.wait(interval_s):
+                self.write_status(filename)
+
+        self.reporter = threading.Thread(target=report, daemon=True)
+        self.reporter.start()
+
+        if http_port is not None:
+            self.server = ThreadingHTTPServer(
+                ("127.0.0.1", http_port), self._make_handler()
+            )
+            threading.Thread(
+                target=self.server.serve_forever, daemon=True
+            ).start()
+
+    def stop_reporting(self, filename: str = None) -> None:
+        """Останавливает фоновые потоки, записывает итоговый статус"""
+        self.stop_event.set()
+        if self.reporter:
+            self.reporter.join()
+            self.reporter = None
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if filename:
+            self.write_status(filename)
+
+    def _make_handler(self) -> type:
+        tracker = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = json.dumps(tracker.status or tracker.snapshot())
+                body = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass  # не засоряем лог парсера запросами статуса
+
+        return StatusHandler
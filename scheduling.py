@@ -0,0 +1,76 @@
+"""Порядок обхода категорий по истории прошлых запусков.
+
+Для каждой категории сохраняется кол-во товаров (pagination.total)
+и сглаженное время запроса страницы. Категории обходятся от самой долгой
+к самой короткой (LPT), новые категории -- в самом начале, чтобы их размер
+стал известен как можно раньше.
+"""
+import threading
+from copy import deepcopy
+
+from stuff import load_json_state, save_json_state
+
+
+class CategoryHistory:
+    def __init__(self, state_file: str, smoothing: float = 0.3):
+        self.state_file = state_file
+        self.smoothing = smoothing
+
+        # {slug: {"total": int, "page_latency": float, "page_items": float}}
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Загружает сохранённую историю, если файл есть"""
+        self.stats = load_json_state(self.state_file, {})
+
+    def save(self) -> None:
+        with self.lock:
+            stats = deepcopy(self.stats)
+        save_json_state(self.state_file, stats)
+
+    def record_total(self, slug: str, total: int) -> None:
+        """Запоминает кол-во товаров в категории"""
+        with self.lock:
+            self.stats.setdefault(slug, {})["total"] = total
+
+    def record_page(self, slug: str, items: int, elapsed: float) -> None:
+        """Учитывает время запроса страницы с items товарами"""
+        with self.lock:
+            stat = self.stats.setdefault(slug, {})
+            if "page_latency" not in stat:
+                stat["page_latency"] = elapsed
+                stat["page_items"] = float(items)
+                return
+            stat["page_latency"] += self.smoothing * (
+                elapsed - stat["page_latency"]
+            )
+            stat["page_items"] += self.smoothing * (items - stat["page_items"])
+
+    def estimate(self, slug: str) -> float:
+        """Оценка времени обхода категории в секундах.
+        None -- категория ещё ни разу не обходилась
+        """
+        stat = self.stats.get(slug)
+        if not stat or "total" not in stat:
+            return None
+
+        if stat.get("page_items"):
+            pages = stat["total"] / stat["page_items"]
+            return max(pages, 1) * stat["page_latency"]
+        # время неизвестно -- оцениваем только по кол-ву товаров
+        return float(stat["total"])
+
+    def order(self, categories: list[dict]) -> list[dict]:
+        """Сортирует категории: сначала новые, затем по убыванию оценки"""
+        with self.lock:
+            estimates = {
+                category["slug"]: self.estimate(category["slug"])
+                for category in categories
+            }
+
+        new = [c for c in categories if estimates[c["slug"]] is None]
+        known = [c for c in categories if estimates[c["slug"]] is not None]
+        known.sort(key=lambda c: estimates[c["slug"]], reverse=True)
+        return new + known
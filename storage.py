@@ -0,0 +1,152 @@
+"""Хранилище результатов в SQLite: категории, товары и история цен"""
+import sqlite3
+import threading
+
+from writers import to_text
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    slug TEXT PRIMARY KEY,
+    original_id INTEGER,
+    title TEXT,
+    parent_slug TEXT
+);
+
+CREATE TABLE IF NOT EXISTS products (
+    shop_id INTEGER NOT NULL,
+    sku TEXT NOT NULL,
+    name TEXT,
+    category TEXT,
+    brand TEXT,
+    country TEXT,
+    link TEXT,
+    image TEXT,
+    price REAL,
+    price_promo REAL,
+    status INTEGER,
+    instock TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (shop_id, sku)
+);
+CREATE INDEX IF NOT EXISTS products_category_idx ON products (category);
+
+CREATE TABLE IF NOT EXISTS price_history (
+    shop_id INTEGER NOT NULL,
+    sku TEXT NOT NULL,
+    price_datetime TEXT NOT NULL,
+    price REAL,
+    price_promo REAL,
+    PRIMARY KEY (shop_id, sku, price_datetime)
+) WITHOUT ROWID;
+"""
+
+UPSERT_CATEGORY = """
+INSERT INTO categories (original_id, title, slug, parent_slug)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (slug) DO UPDATE SET
+    original_id = excluded.original_id,
+    title = excluded.title,
+    parent_slug = excluded.parent_slug
+"""
+
+UPSERT_PRODUCT = """
+INSERT INTO products (
+    shop_id, sku, name, category, brand, country, link, image,
+    price, price_promo, status, instock, updated_at
+)
+VALUES (
+    :shop_id, :sku_article, :sku_name, :sku_category, :sku_brand,
+    :sku_country, :sku_link, :sku_images, :price, :price_promo,
+    :sku_status, :sku_instock, :price_datetime
+)
+ON CONFLICT (shop_id, sku) DO UPDATE SET
+    name = excluded.name,
+    category = excluded.category,
+    brand = excluded.brand,
+    country = excluded.country,
+    link = excluded.link,
+    image = excluded.image,
+    price = excluded.price,
+    price_promo = excluded.price_promo,
+    status = excluded.status,
+    instock = excluded.instock,
+    updated_at = excluded.updated_at
+"""
+
+INSERT_PRICE = """
+INSERT INTO price_history (shop_id, sku, price_datetime, price, price_promo)
+VALUES (:shop_id, :sku_article, :price_datetime, :price, :price_promo)
+ON CONFLICT (shop_id, sku, price_datetime) DO UPDATE SET
+    price = excluded.price,
+    price_promo = excluded.price_promo
+"""
+
+
+class SQLiteStore:
+    """Хранилище результатов парсинга.
+
+    Товары копятся в буфере и записываются пачками по batch_size
+    в одной транзакции. Объект можно использовать из нескольких потоков.
+    """
+
+    def __init__(self, path: str, shop_id: int, batch_size: int = 500):
+        self.shop_id = shop_id
+        self.batch_size = batch_size
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+        self.buffer = []
+        self.lock = threading.Lock()
+
+    def save_categories(self, rows: list[list]) -> None:
+        """Записывает категории. Строки в формате
+        [original_id, title, id (slug), parent_id (slug)]
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(UPSERT_CATEGORY, rows)
+
+    def add_product(self, record: dict) -> None:
+        """Добавляет товар в буфер, при заполнении буфера пишет в базу.
+        Ключи record -- названия колонок products.csv
+        """
+        # нескалярные значения (остатки и т.п.) -- JSON-строкой
+        record = {key: to_text(value) for key, value in record.items()}
+        record["shop_id"] = self.shop_id
+
+        with self.lock:
+            self.buffer.append(record)
+            if len(self.buffer) >= self.batch_size:
+                self._flush()
+
+    def flush(self) -> None:
+        """Записывает в базу всё, что осталось в буфере"""
+        with self.lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self.buffer:
+            return
+
+        with self.connection:
+            self.connection.executemany(UPSERT_PRODUCT, self.buffer)
+            self.connection.executemany(INSERT_PRICE, self.buffer)
+        self.buffer = []
+
+    def price_history(self, sku: str, shop_id: int = None) -> list[tuple]:
+        """История цен товара: [(price_datetime, price, price_promo), ...]"""
+        shop_id = self.shop_id if shop_id is None else shop_id
+        with self.lock:
+            return self.connection.execute(
+                "SELECT price_datetime, price, price_promo "
+                + "FROM price_history WHERE shop_id = ? AND sku = ? "
+                + "ORDER BY price_datetime",
+                (shop_id, sku),
+            ).fetchall()
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
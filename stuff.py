@@ -1,13 +1,73 @@
 """Supporting funcs"""
+import atexit
+import itertools
+import json
 import logging
 import logging.config
+import logging.handlers
+import os
+import queue
 import random
 from time import time, sleep
-from typing import Union, Callable
+from typing import Any, Union, Callable
+
+
+class ThreadQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler для очереди внутри процесса.
+    Запись передаётся в очередь как есть: форматирование сообщения
+    выполняется в потоке QueueListener, а не в рабочем потоке.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_queue_logging() -> logging.handlers.QueueListener:
+    """Переносит обработчики корневого логгера (файлы, консоль)
+    в фоновый поток QueueListener. Рабочие потоки только кладут
+    записи в очередь и не ждут записи на диск под общим lock'ом.
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    log_queue = queue.SimpleQueue()
+
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(ThreadQueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
 
 
 logging.config.fileConfig("logging.conf")
 logger = logging.getLogger(__name__)
+log_listener = setup_queue_logging()
+
+
+class LogSampler:
+    """Прореживание частых сообщений: для класса сообщений key
+    разрешает одно сообщение из every[key] (по умолчанию -- все).
+    Без блокировок: next() у itertools.count атомарен.
+    """
+
+    def __init__(self, every: dict[str, int]):
+        self.every = every
+        self.counters = {}
+
+    def should_log(self, key: str) -> bool:
+        """True для 1-го, (every + 1)-го и т.д. сообщения класса key"""
+        counter = self.counters.setdefault(key, itertools.count())
+        return next(counter) % self.every.get(key, 1) == 0
+
+
+class NoRetryError(Exception):
+    """Ошибка, после которой request_repeater не повторяет запрос,
+    а сразу пробрасывает её вызывающему коду
+    """
 
 
 def calculate_delay(
@@ -60,11 +120,16 @@ def request_repeater(func: Callable) -> Callable:
                 )
                 logger.info(f"Trying to get data again. Attempt {starts}")
 
-            sleep_between_requests(time_to_sleep)
+            # сообщение о паузе -- на каждый запрос, пишется выборочно
+            sampler = getattr(obj, "log_sampler", None)
+            log_sleep = sampler is None or sampler.should_log("sleeps")
+            sleep_between_requests(time_to_sleep, log=log_sleep)
 
             try:
                 result = func(obj, *args, **kwargs)
                 return result
+            except NoRetryError:
+                raise
             except Exception as e:
                 logger.error(f"Exception in: {func.__name__}: {e}")
 
@@ -119,8 +184,10 @@ def get_time_to_sleep(time_range: Union[list[int], int]) -> int:
     )
 
 
-def sleep_between_requests(time_range: Union[list[int], int]) -> None:
-    """Делает паузу между запросами"""
+def sleep_between_requests(
+    time_range: Union[list[int], int], log: bool = True
+) -> None:
+    """Делает паузу между запросами. log -- писать ли паузу в лог"""
     if time_range == 0:
         return
 
@@ -129,5 +196,30 @@ def sleep_between_requests(time_range: Union[list[int], int]) -> None:
     else:
         time_to_sleep = get_time_to_sleep(time_range)
 
-    logger.info(f"Sleep {time_to_sleep} seconds.")
+    if log:
+        logger.debug("Sleep %s seconds.", time_to_sleep)
     sleep(time_to_sleep)
+
+
+def load_json_state(filename: str, default: Any) -> Any:
+    """Загружает состояние прошлых запусков из JSON-файла.
+    Если файла нет или он повреждён, возвращает default
+    """
+    if not os.path.exists(filename):
+        return default
+    try:
+        with open(filename, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        logger.warning(f"State file '{filename}' is ignored: {e}")
+        return default
+
+
+def save_json_state(filename: str, data: Any) -> None:
+    """Сохраняет состояние в JSON-файл целиком (через временный файл),
+    чтобы прерванная запись не оставила обрезанный файл
+    """
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "w") as file:
+        json.dump(data, file, indent=4)
+    os.replace(tmp_filename, filename)
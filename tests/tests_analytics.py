@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+import analytics
+from analytics import build_snapshot, summarize, write_analytics
+
+HEADER = ["price", "price_promo", "sku_status", "sku_article", "sku_category"]
+
+
+@unittest.skipUnless(analytics.np is not None, "numpy is not installed")
+class TestSummarize(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rows = [
+            [100.0, 80.0, 1, "1", "Пасты"],
+            [200.0, 200.0, 0, "2", "Пасты"],
+            [50.0, 25.0, 1, "3", "Пасты"],
+            [10.0, 10.0, 1, "4", "Мыло"],
+            [None, None, None, "5", "Мыло"],
+        ]
+
+    def test_category_stats(self) -> None:
+        summary = summarize(build_snapshot(self.rows, HEADER))
+        pasta = summary["categories"]["Пасты"]
+
+        self.assertEqual(summary["products"], 5)
+        self.assertEqual(pasta["products"], 3)
+        self.assertEqual(
+            pasta["price_promo"],
+            {
+                "count": 3,
+                "mean": 101.6667,
+                "min": 25.0,
+                "median": 80.0,
+                "max": 200.0,
+            },
+        )
+        self.assertEqual(pasta["promo_depth_max"], 0.5)
+        self.assertEqual(pasta["promo_share"], 0.6667)
+        self.assertEqual(pasta["in_stock_share"], 0.6667)
+
+    def test_missing_prices_are_ignored(self) -> None:
+        soap = summarize(build_snapshot(self.rows, HEADER))["categories"][
+            "Мыло"
+        ]
+
+        self.assertEqual(soap["products"], 2)
+        self.assertEqual(soap["price_promo"]["count"], 1)
+        self.assertEqual(soap["price_promo"]["median"], 10.0)
+        self.assertEqual(soap["promo_depth_mean"], 0.0)
+
+    def test_changes_against_previous(self) -> None:
+        previous = build_snapshot(
+            [
+                [100.0, 100.0, 1, "1", "Пасты"],
+                [200.0, 200.0, 1, "2", "Пасты"],
+                [50.0, 50.0, 1, "3", "Пасты"],
+                [70.0, 70.0, 1, "9", "Пасты"],
+                [30.0, 30.0, 1, "8", "Другое"],
+            ],
+            HEADER,
+        )
+        changes = summarize(build_snapshot(self.rows, HEADER), previous)[
+            "changes"
+        ]
+
+        self.assertEqual(changes["matched"], 3)
+        self.assertEqual(changes["new"], 2)
+        # товар другой категории не считается удалённым
+        self.assertEqual(changes["removed"], 1)
+        self.assertEqual(changes["decreased"], 2)
+        self.assertEqual(changes["unchanged"], 1)
+        self.assertEqual(changes["mean_change"], -0.2333)
+
+
+@unittest.skipUnless(analytics.np is not None, "numpy is not installed")
+class TestWriteAnalytics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_file = os.path.join(self.tmp_dir.name, "snapshot.npz")
+        self.summary_file = os.path.join(self.tmp_dir.name, "summary.json")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def write(self, rows: list[list]) -> dict:
+        return write_analytics(
+            rows, HEADER, self.snapshot_file, self.summary_file
+        )
+
+    def test_second_run_is_compared_with_first(self) -> None:
+        first = self.write([[10.0, 10.0, 1, "1", "Мыло"]])
+        self.assertNotIn("changes", first)
+
+        self.write([[10.0, 12.0, 1, "1", "Мыло"]])
+        with open(self.summary_file) as file:
+            summary = json.load(file)
+
+        self.assertEqual(summary["changes"]["increased"], 1)
+        self.assertEqual(summary["changes"]["mean_change"], 0.2)
+
+    def test_snapshot_keeps_categories_missing_from_run(self) -> None:
+        self.write([[10.0, 10.0, 1, "1", "Мыло"], [5.0, 5.0, 1, "2", "Соль"]])
+        self.write([[10.0, 9.0, 1, "1", "Мыло"]])
+
+        snapshot = analytics.load_snapshot(self.snapshot_file)
+        self.assertEqual(sorted(snapshot["sku"].tolist()), ["1", "2"])
+
+    def test_empty_run(self) -> None:
+        summary = self.write([])
+
+        self.assertEqual(summary["products"], 0)
+        self.assertIsNone(summary["price_promo"]["mean"])
+
+
+if __name__ == "__main__":
+    unittest.main()
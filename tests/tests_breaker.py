@@ -0,0 +1,97 @@
+import logging
+import os
+import sys
+import threading
+import unittest
+from time import monotonic, sleep
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from stuff import logger
+from breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    breakers_snapshot,
+    get_breaker,
+)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.setLevel(level=logging.CRITICAL)
+
+    def test_opens_after_threshold(self) -> None:
+        breaker = CircuitBreaker("test", failure_threshold=3)
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.snapshot()["opens"], 1)
+
+    def test_success_resets_failures(self) -> None:
+        breaker = CircuitBreaker("test", failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_open_pauses_until_recovery_timeout(self) -> None:
+        breaker = CircuitBreaker(
+            "test", failure_threshold=1, recovery_timeout=0.2
+        )
+        breaker.record_failure()
+
+        started = monotonic()
+        breaker.acquire()
+
+        self.assertGreaterEqual(monotonic() - started, 0.15)
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+    def test_single_probe_in_half_open(self) -> None:
+        breaker = CircuitBreaker(
+            "test", failure_threshold=1, recovery_timeout=0.1
+        )
+        breaker.record_failure()
+        breaker.acquire()  # пробный запрос
+
+        passed = []
+        worker = threading.Thread(
+            target=lambda: passed.append(breaker.acquire() or True)
+        )
+        worker.start()
+        sleep(0.2)
+        # пока идёт пробный запрос, остальные потоки ждут
+        self.assertEqual(passed, [])
+
+        breaker.record_success()
+        worker.join(timeout=1)
+        self.assertEqual(passed, [True])
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_failed_probe_reopens(self) -> None:
+        breaker = CircuitBreaker(
+            "test", failure_threshold=1, recovery_timeout=0.05
+        )
+        breaker.record_failure()
+        breaker.acquire()
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.snapshot()["opens"], 2)
+
+
+class TestGetBreaker(unittest.TestCase):
+    def test_breaker_is_shared(self) -> None:
+        breaker = get_breaker("shared-endpoint", failure_threshold=1)
+
+        self.assertIs(get_breaker("shared-endpoint"), breaker)
+        self.assertIn("shared-endpoint", breakers_snapshot())
+
+
+if __name__ == "__main__":
+    unittest.main()
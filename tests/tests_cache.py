@@ -0,0 +1,84 @@
+import os
+import sys
+import threading
+import unittest
+from time import sleep
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from cache import SingleFlightLRU
+
+
+class TestSingleFlightLRU(unittest.TestCase):
+    def test_hit_after_fetch(self) -> None:
+        cache = SingleFlightLRU(max_bytes=100)
+        calls = []
+
+        def fetch() -> tuple:
+            calls.append(1)
+            return {"slug": "pasta"}, 10
+
+        cache.get_or_fetch("url", fetch)
+        result = cache.get_or_fetch("url", fetch)
+
+        self.assertEqual(result, {"slug": "pasta"})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.snapshot()["hits"], 1)
+
+    def test_evicts_least_recently_used_by_size(self) -> None:
+        cache = SingleFlightLRU(max_bytes=25)
+        cache.get_or_fetch("a", lambda: ("A", 10))
+        cache.get_or_fetch("b", lambda: ("B", 10))
+        cache.get_or_fetch("a", lambda: ("A", 10))  # a -- свежее b
+        cache.get_or_fetch("c", lambda: ("C", 10))
+
+        self.assertEqual(list(cache.items), ["a", "c"])
+        self.assertEqual(cache.current_bytes, 20)
+
+    def test_too_big_and_failed_values_are_not_cached(self) -> None:
+        cache = SingleFlightLRU(max_bytes=25)
+        cache.get_or_fetch("big", lambda: ("X", 100))
+        cache.get_or_fetch("failed", lambda: (False, None))
+
+        self.assertEqual(len(cache.items), 0)
+
+    def test_concurrent_requests_fetch_once(self) -> None:
+        cache = SingleFlightLRU(max_bytes=100)
+        calls = []
+
+        def fetch() -> tuple:
+            calls.append(1)
+            sleep(0.2)
+            return "value", 5
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    cache.get_or_fetch("url", fetch)
+                )
+            )
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 10)
+        self.assertEqual(cache.snapshot()["coalesced"], 9)
+
+    def test_error_is_shared_and_not_cached(self) -> None:
+        cache = SingleFlightLRU(max_bytes=100)
+
+        def fetch() -> tuple:
+            raise ValueError("TestError")
+
+        with self.assertRaises(ValueError):
+            cache.get_or_fetch("url", fetch)
+        self.assertEqual(cache.get_or_fetch("url", lambda: ("ok", 2)), "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
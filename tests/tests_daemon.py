@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from daemon import RefreshScheduler, assign_intervals
+
+
+class TestAssignIntervals(unittest.TestCase):
+    def test_interval_is_inherited_from_parent(self) -> None:
+        tree = [
+            {
+                "slug": "gigiena",
+                "children": [
+                    {"slug": "zubnye-pasty"},
+                    {"slug": "shampuni"},
+                ],
+            },
+            {"slug": "krupy", "children": []},
+        ]
+
+        result = assign_intervals(
+            tree, {"gigiena": 60, "shampuni": 30}, 1440
+        )
+
+        self.assertEqual(
+            result, {"zubnye-pasty": 60, "shampuni": 30, "krupy": 1440}
+        )
+
+
+class TestRefreshScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.scheduler = RefreshScheduler({"pasty": 60, "krupy": 1440})
+
+    def test_new_categories_are_due_at_once(self) -> None:
+        due = self.scheduler.take_due(now=1000)
+
+        self.assertEqual(sorted(due), ["krupy", "pasty"])
+
+    def test_running_categories_are_not_taken_twice(self) -> None:
+        self.scheduler.take_due(now=1000)
+
+        self.assertEqual(self.scheduler.take_due(now=100000), [])
+
+    def test_next_refresh_after_interval(self) -> None:
+        self.scheduler.take_due(now=1000)
+        self.scheduler.done(["pasty", "krupy"], now=2000)
+
+        self.assertEqual(self.scheduler.take_due(now=2000 + 59 * 60), [])
+        self.assertEqual(
+            self.scheduler.take_due(now=2000 + 60 * 60), ["pasty"]
+        )
+        self.assertEqual(self.scheduler.seconds_to_next(now=2000), 1440 * 60)
+
+    def test_missed_refreshes_are_coalesced(self) -> None:
+        self.scheduler.take_due(now=0)
+        # цикл длился дольше трёх интервалов -- следующий запуск один
+        self.scheduler.done(["pasty"], now=4 * 3600)
+
+        self.assertEqual(self.scheduler.take_due(now=4 * 3600), [])
+        self.assertEqual(self.scheduler.take_due(now=5 * 3600), ["pasty"])
+
+    def test_retry_after_failure(self) -> None:
+        self.scheduler.take_due(now=0)
+        self.scheduler.done(["pasty"], retry_min=1, now=0)
+
+        self.assertEqual(self.scheduler.take_due(now=60), ["pasty"])
+
+    def test_removed_categories_are_forgotten(self) -> None:
+        self.scheduler.take_due(now=0)
+        self.scheduler.update_intervals({"pasty": 60})
+        self.scheduler.done(["pasty", "krupy"], now=0)
+
+        self.assertEqual(list(self.scheduler.next_due), ["pasty"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import os
+import sys
+import unittest
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from decoders import MalformedJSONError, decode_json
+
+
+class TestDecodeJson(unittest.TestCase):
+    def test_decode_bytes(self) -> None:
+        data = '{"items": [{"title": "Паста"}], "pagination": null}'
+        result = decode_json(data.encode("utf-8"))
+
+        self.assertEqual(
+            result, {"items": [{"title": "Паста"}], "pagination": None}
+        )
+
+    def test_truncated_json(self) -> None:
+        with self.assertRaises(MalformedJSONError):
+            decode_json(b'{"items": [{"title": "Pas')
+
+    def test_invalid_utf8(self) -> None:
+        with self.assertRaises(MalformedJSONError):
+            decode_json(b'{"title": "\xff\xfe"}')
+
+
+if __name__ == "__main__":
+    unittest.main()
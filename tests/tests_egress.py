@@ -0,0 +1,189 @@
+import logging
+import os
+import sys
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic, sleep
+from unittest.mock import patch
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from stuff import logger
+from egress import EgressPool
+
+
+class SourceHandler(BaseHTTPRequestHandler):
+    """Заглушка источника"""
+
+    def do_GET(self) -> None:
+        self.reply(200, b'{"items": []}')
+
+    def reply(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class ProxyHandler(SourceHandler):
+    """Локальный прокси: пересылает запрос источнику"""
+
+    requests = 0
+
+    def do_GET(self) -> None:
+        type(self).requests += 1
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        with opener.open(self.path, timeout=5) as response:
+            self.reply(response.status, response.read())
+
+
+class BrokenProxyHandler(ProxyHandler):
+    """Прокси, который всегда отвечает ошибкой"""
+
+    requests = 0
+
+    def do_GET(self) -> None:
+        type(self).requests += 1
+        self.reply(502, b"Bad Gateway")
+
+
+class UrllibSession:
+    """Минимальная сессия поверх urllib с полем proxies, как у requests"""
+
+    proxies = None
+
+    def get(self, url: str) -> bytes:
+        opener = urllib.request.build_opener(
+            urllib.request.ProxyHandler(self.proxies)
+        )
+        with opener.open(url, timeout=5) as response:
+            return response.read()
+
+
+def start_server(handler: type) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TestEgressPoolWithLocalProxies(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.setLevel(level=logging.CRITICAL)
+        ProxyHandler.requests = 0
+        BrokenProxyHandler.requests = 0
+        self.servers = [
+            start_server(SourceHandler),
+            start_server(ProxyHandler),
+            start_server(BrokenProxyHandler),
+        ]
+        self.source_url = f"http://127.0.0.1:{self.servers[0].server_port}/"
+        self.proxies = [
+            f"http://127.0.0.1:{server.server_port}"
+            for server in self.servers[1:]
+        ]
+        self.env = patch.dict(os.environ, {"no_proxy": "", "NO_PROXY": ""})
+        self.env.start()
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def fetch(self, pool: EgressPool) -> bytes:
+        egress = pool.acquire()
+        started = monotonic()
+        try:
+            result = egress.session.get(self.source_url)
+        except urllib.error.URLError:
+            pool.report(egress, False, monotonic() - started)
+            raise
+        pool.report(egress, True, monotonic() - started)
+        return result
+
+    def test_broken_proxy_is_avoided(self) -> None:
+        pool = EgressPool(
+            self.proxies,
+            UrllibSession,
+            rate_limit_rps=1000,
+            bench_s=60,
+            min_requests=3,
+        )
+
+        results = []
+        for _ in range(30):
+            try:
+                results.append(self.fetch(pool))
+            except urllib.error.URLError:
+                pass
+
+        self.assertLessEqual(BrokenProxyHandler.requests, 5)
+        self.assertGreaterEqual(ProxyHandler.requests, 25)
+        self.assertTrue(all(r == b'{"items": []}' for r in results))
+        self.assertGreater(pool.snapshot()[self.proxies[1]]["error_rate"], 0)
+
+
+class TestEgressPool(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.setLevel(level=logging.CRITICAL)
+
+    def test_rate_limit_per_egress(self) -> None:
+        pool = EgressPool(["http://a", "http://b"], UrllibSession, 10)
+
+        started = monotonic()
+        for _ in range(6):
+            pool.acquire()
+        elapsed = monotonic() - started
+
+        # 2 запроса сразу, дальше по 20 в секунду на два прокси
+        self.assertGreaterEqual(elapsed, 0.15)
+
+    def test_requests_are_spread(self) -> None:
+        pool = EgressPool(["http://a", "http://b"], UrllibSession, 10**6)
+
+        used = set()
+        for _ in range(4):
+            egress = pool.acquire()
+            used.add(egress.proxy)
+            pool.report(egress, True, 0.1 if egress.proxy == "http://a" else 1)
+
+        self.assertEqual(used, {"http://a", "http://b"})
+        self.assertEqual(pool.acquire().proxy, "http://a")
+
+    def test_failing_egress_loses_to_healthy(self) -> None:
+        pool = EgressPool(
+            ["http://good", "http://dead"], UrllibSession, 10**6, bench_s=0.01
+        )
+
+        used = []
+        for _ in range(20):
+            egress = pool.acquire()
+            used.append(egress.proxy)
+            pool.report(egress, egress.proxy == "http://good", 0.1)
+            if len(used) == 10:
+                sleep(0.02)  # на случай, если dead исключался -- вернулся
+
+        # dead пробуется один раз, пока о нём ничего не известно
+        self.assertEqual(used.count("http://dead"), 1)
+
+    def test_failing_egress_is_benched(self) -> None:
+        pool = EgressPool(["http://dead"], UrllibSession, 10**6, bench_s=60)
+
+        for _ in range(5):
+            pool.report(pool.acquire(), False, 0.1)
+
+        self.assertTrue(pool.snapshot()["http://dead"]["benched"])
+
+    def test_empty_pool(self) -> None:
+        with self.assertRaises(ValueError):
+            EgressPool([], UrllibSession)
+
+
+if __name__ == "__main__":
+    unittest.main()
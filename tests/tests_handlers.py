@@ -6,6 +6,9 @@ import sys
 sys.path.append(os.getcwd())
 from handlers import (
     build_sku_category,
+    extract_attributes,
+    merge_attributes,
+    missing_attributes,
     prepare_string,
     prepare_row,
 )
@@ -116,5 +119,61 @@ class TestPrepareRow(unittest.TestCase):
         self.assertEqual(result, expected_result)
 
 
+class TestExtractAttributes(unittest.TestCase):
+    def setUp(self) -> None:
+        self.attributes = {"country": "country", "weight": "ves"}
+
+    def test_extract_attributes(self):
+        payload = {
+            "characteristics": [
+                {"productProp": {"code": "brand"}, "value": "Splat"},
+                {"productProp": {"code": "country"}, "value": "Россия"},
+            ]
+        }
+        expected_result = {"country": "Россия", "weight": None}
+
+        result = extract_attributes(payload, self.attributes)
+
+        self.assertEqual(result, expected_result)
+
+    def test_extract_attributes_without_characteristics(self):
+        self.assertIsNone(extract_attributes({}, self.attributes))
+        self.assertIsNone(
+            extract_attributes({"characteristics": None}, self.attributes)
+        )
+        self.assertIsNone(extract_attributes(False, self.attributes))
+
+    def test_extract_attributes_empty_characteristics(self):
+        payload = {"characteristics": []}
+        expected_result = {"country": None, "weight": None}
+
+        result = extract_attributes(payload, self.attributes)
+
+        self.assertEqual(result, expected_result)
+
+    def test_missing_attributes(self):
+        self.assertTrue(missing_attributes(None, self.attributes))
+        self.assertTrue(
+            missing_attributes(
+                {"country": "Россия", "weight": None}, self.attributes
+            )
+        )
+        self.assertFalse(
+            missing_attributes(
+                {"country": "Россия", "weight": "1 кг"}, self.attributes
+            )
+        )
+
+    def test_merge_attributes(self):
+        listing = {"country": "Россия", "weight": None}
+        detail = {"country": "Китай", "weight": "1 кг"}
+        expected_result = {"country": "Россия", "weight": "1 кг"}
+
+        self.assertEqual(merge_attributes(listing, detail), expected_result)
+        self.assertEqual(merge_attributes(None, detail), detail)
+        self.assertEqual(merge_attributes(listing, None), listing)
+        self.assertIsNone(merge_attributes(None, None))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,129 @@
+import itertools
+import os
+import sys
+import threading
+import unittest
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic, sleep
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from hedging import Hedger
+
+
+class SpikyHandler(BaseHTTPRequestHandler):
+    """Заглушка источника: каждый 5-й запрос отвечает с задержкой"""
+
+    counter = itertools.count(1)
+    spike_s = 2.0
+
+    def do_GET(self) -> None:
+        if next(self.counter) % 5 == 0:
+            sleep(self.spike_s)
+        else:
+            sleep(0.01)
+
+        body = b'{"items": []}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class TestHedgerWithStubServer(unittest.TestCase):
+    def setUp(self) -> None:
+        SpikyHandler.counter = itertools.count(1)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SpikyHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def fetch(self) -> bytes:
+        with urllib.request.urlopen(self.url, timeout=10) as response:
+            return response.read()
+
+    def test_spikes_are_hedged(self) -> None:
+        hedger = Hedger(percentile=50, budget=1, min_samples=3)
+        for _ in range(3):
+            hedger.call("source", self.fetch)
+
+        started = monotonic()
+        for _ in range(7):
+            result = hedger.call("source", self.fetch)
+            self.assertEqual(result, b'{"items": []}')
+        elapsed = monotonic() - started
+
+        self.assertGreaterEqual(hedger.hedges_won, 1)
+        self.assertLess(elapsed, SpikyHandler.spike_s)
+
+    def test_budget_limits_hedges(self) -> None:
+        hedger = Hedger(percentile=50, budget=0, min_samples=3)
+        for _ in range(5):
+            hedger.call("source", self.fetch)
+
+        self.assertEqual(hedger.hedged, 0)
+
+
+class TestHedger(unittest.TestCase):
+    def test_no_hedging_without_samples(self) -> None:
+        hedger = Hedger(min_samples=20)
+
+        self.assertIsNone(hedger.hedge_delay("source"))
+        self.assertEqual(hedger.call("source", lambda: 42), 42)
+
+    def test_hedge_delay_percentile(self) -> None:
+        hedger = Hedger(percentile=90, min_samples=10)
+        for latency in range(1, 11):
+            hedger._record("source", latency / 10)
+
+        self.assertEqual(hedger.hedge_delay("source"), 0.9)
+
+    def test_latencies_per_endpoint(self) -> None:
+        hedger = Hedger(percentile=50, min_samples=3)
+        for _ in range(3):
+            hedger._record("products", 2.0)
+            hedger._record("products/{slug}", 0.1)
+
+        self.assertEqual(hedger.hedge_delay("products"), 2.0)
+        self.assertEqual(hedger.hedge_delay("products/{slug}"), 0.1)
+        self.assertIsNone(hedger.hedge_delay("categories"))
+
+    def test_hedge_is_paced(self) -> None:
+        paces = []
+        hedger = Hedger(
+            percentile=50,
+            budget=1,
+            min_samples=1,
+            pace=lambda: paces.append(1),
+        )
+        hedger._record("source", 0.01)
+
+        def slow() -> int:
+            sleep(0.1)
+            return 42
+
+        self.assertEqual(hedger.call("source", slow), 42)
+        self.assertEqual(hedger.hedged, 1)
+        self.assertEqual(paces, [1])
+
+    def test_all_attempts_failed(self) -> None:
+        hedger = Hedger(percentile=50, budget=1, min_samples=1)
+        hedger._record("source", 0.01)
+
+        def fail() -> None:
+            sleep(0.05)
+            raise ValueError("TestError")
+
+        with self.assertRaises(ValueError):
+            hedger.call("source", fail)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import logging
+import os
+import re
+import sys
+import unittest
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from stuff import NoRetryError, logger
+from main import Parser
+
+
+class FakeSource:
+    """Заглушка Parser.fetch_json_data для страниц товаров категории.
+    max_items -- окна больше этого размера приходят некорректным JSON,
+    broken -- товары, окно с которыми всегда некорректно,
+    fail_from -- окна, начинающиеся с этого товара, не получаются
+    (исчерпаны попытки, fetch_json_data возвращает False)
+    """
+
+    def __init__(
+        self,
+        total: int,
+        max_items: int = None,
+        broken: tuple = (),
+        fail_from: int = None,
+    ):
+        self.total = total
+        self.max_items = max_items
+        self.broken = broken
+        self.fail_from = fail_from
+        self.requests = []
+
+    def __call__(self, url: str, **kwargs) -> dict:
+        page = int(re.search(r"[?&]page=(\d+)", url).group(1))
+        limit = int(re.search(r"[?&]limit=(\d+)", url).group(1))
+        offset = (page - 1) * limit
+        self.requests.append((offset, limit))
+
+        if self.fail_from is not None and offset >= self.fail_from:
+            return False
+        end = min(offset + limit, self.total)
+        too_big = self.max_items is not None and limit > self.max_items
+        if too_big or any(offset <= i < end for i in self.broken):
+            raise NoRetryError("malformed JSON")
+        return {
+            "items": [{"id": i} for i in range(offset, end)],
+            "pagination": {
+                "page": page,
+                "pages": -(-self.total // limit),
+                "total": self.total,
+            },
+        }
+
+
+class TestParserProducts(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.setLevel(level=logging.CRITICAL)
+        self.parser = Parser()
+        self.parser.limit_tuner = None
+        self.parser.config["products_limit"] = 10
+        self.category = {"slug": "pasty"}
+
+    def get_products(self, source: FakeSource) -> list[int]:
+        self.parser.fetch_json_data = source
+        self.parser.categories_to_parse = [self.category]
+        self.parser._get_products_thread()
+        return [item["id"] for item in self.parser.products]
+
+    def test_all_pages_until_total(self) -> None:
+        ids = self.get_products(FakeSource(total=25))
+
+        self.assertEqual(ids, list(range(25)))
+        self.assertEqual(self.parser.failed_categories, [])
+
+    def test_malformed_windows_are_split(self) -> None:
+        source = FakeSource(total=25, max_items=3)
+        ids = self.get_products(source)
+
+        # каждый товар ровно один раз и по порядку, включая окно с 0
+        self.assertEqual(ids, list(range(25)))
+        self.assertEqual(source.requests[:2], [(0, 10), (0, 5)])
+        # за пределы total раздробленное окно не запрашивается
+        self.assertTrue(all(offset < 25 for offset, _ in source.requests))
+
+    def test_broken_item_is_skipped(self) -> None:
+        source = FakeSource(total=25, broken=(7,))
+        ids = self.get_products(source)
+
+        self.assertEqual(ids, [i for i in range(25) if i != 7])
+        self.assertIn((7, 1), source.requests)
+
+    def test_pagination_from_first_received_sub_window(self) -> None:
+        ids = self.get_products(FakeSource(total=25, broken=(0,)))
+
+        self.assertEqual(ids, list(range(1, 25)))
+        self.assertEqual(self.parser.failed_categories, [])
+
+    def test_failed_window_fails_category(self) -> None:
+        self.get_products(FakeSource(total=25, fail_from=10))
+
+        self.assertEqual(self.parser.failed_categories, ["pasty"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from pagination import page_for_window, split_limit, window_limit
+
+
+class TestPageForWindow(unittest.TestCase):
+    def test_page_for_window(self) -> None:
+        self.assertEqual(page_for_window(0, 100), 1)
+        self.assertEqual(page_for_window(300, 100), 4)
+        self.assertEqual(page_for_window(150, 50), 4)
+
+    def test_unaligned_window(self) -> None:
+        with self.assertRaises(ValueError):
+            page_for_window(150, 100)
+
+
+class TestWindowLimit(unittest.TestCase):
+    def test_aligned_offset(self) -> None:
+        self.assertEqual(window_limit(0, 200), 200)
+        self.assertEqual(window_limit(400, 200), 200)
+
+    def test_limit_changed_between_pages(self) -> None:
+        # было 100 на страницу, стало 200: окно 300+100, затем 400+200
+        self.assertEqual(window_limit(300, 200), 100)
+        self.assertEqual(window_limit(150, 100), 50)
+        page_for_window(300, window_limit(300, 200))
+
+
+class TestSplitLimit(unittest.TestCase):
+    def test_split_limit(self) -> None:
+        self.assertEqual(split_limit(100), 50)
+        self.assertEqual(split_limit(25), 5)
+        self.assertEqual(split_limit(7), 1)
+        self.assertEqual(split_limit(2), 1)
+
+    def test_sub_windows_stay_aligned(self) -> None:
+        for limit in (2, 12, 25, 100, 97):
+            offset = limit * 3
+            sub_limit = split_limit(limit)
+            for sub_offset in range(offset, offset + limit, sub_limit):
+                page_for_window(sub_offset, sub_limit)
+
+    def test_split_single_item(self) -> None:
+        with self.assertRaises(ValueError):
+            split_limit(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.request
+from unittest.mock import patch
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from progress import ProgressTracker
+
+
+class TestProgressTracker(unittest.TestCase):
+    def test_counters_from_many_threads(self) -> None:
+        tracker = ProgressTracker()
+
+        def work() -> None:
+            for _ in range(1000):
+                tracker.incr("products_listed")
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tracker.incr("products_total", 10000)
+
+        status = tracker.snapshot()
+        self.assertEqual(status["products"]["done"], 8000)
+        self.assertEqual(status["products"]["total"], 10000)
+
+    def test_rate_and_eta(self) -> None:
+        tracker = ProgressTracker()
+        tracker.incr("enrich_total", 100)
+
+        with patch("progress.monotonic", return_value=1000.0):
+            tracker.snapshot()
+        tracker.incr("products_enriched", 20)
+        with patch("progress.monotonic", return_value=1010.0):
+            status = tracker.snapshot()
+
+        self.assertEqual(status["enrich"]["rate_per_s"], 2.0)
+        self.assertEqual(status["enrich"]["eta_s"], 40.0)
+        self.assertIsNone(status["categories"]["eta_s"])
+
+    def test_reset_starts_new_cycle(self) -> None:
+        tracker = ProgressTracker()
+        tracker.incr("products_total", 100)
+        worker = threading.Thread(target=tracker.incr, args=("pages_done",))
+        worker.start()
+        worker.join()
+
+        tracker.reset()
+        tracker.incr("products_total", 10)  # тот же поток, что до reset()
+
+        self.assertEqual(tracker.totals(), {"products_total": 10})
+        self.assertEqual(len(tracker.thread_counters), 1)
+
+    def test_extra_status(self) -> None:
+        tracker = ProgressTracker(extra=lambda: {"circuit_breakers": {}})
+
+        self.assertEqual(tracker.snapshot()["circuit_breakers"], {})
+
+
+class TestProgressReporting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.status_file = os.path.join(self.tmp_dir.name, "status.json")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_status_file_and_http(self) -> None:
+        tracker = ProgressTracker()
+        tracker.set_phase("listing")
+        tracker.incr("categories_done", 3)
+
+        tracker.start_reporting(self.status_file, 0.05, http_port=0)
+        port = tracker.server.server_port
+        url = f"http://127.0.0.1:{port}/"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            status = json.loads(response.read())
+        tracker.stop_reporting(self.status_file)
+
+        self.assertEqual(status["phase"], "listing")
+        self.assertEqual(status["categories"]["done"], 3)
+        with open(self.status_file) as file:
+            self.assertEqual(json.load(file)["categories"]["done"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
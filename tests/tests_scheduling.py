@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from scheduling import CategoryHistory
+
+
+class TestCategoryHistory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.tmp_dir.name, "history.json")
+        self.history = CategoryHistory(self.state_file)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_estimate(self) -> None:
+        self.assertIsNone(self.history.estimate("pasty"))
+
+        self.history.record_total("pasty", 1000)
+        self.history.record_page("pasty", 100, 2.0)
+
+        self.assertEqual(self.history.estimate("pasty"), 20.0)
+
+    def test_order_longest_first_new_before_known(self) -> None:
+        self.history.record_total("small", 100)
+        self.history.record_page("small", 100, 1.0)
+        self.history.record_total("big", 5000)
+        self.history.record_page("big", 100, 1.0)
+        self.history.record_total("slow", 1000)
+        self.history.record_page("slow", 100, 10.0)
+
+        categories = [
+            {"slug": "small"},
+            {"slug": "big"},
+            {"slug": "new"},
+            {"slug": "slow"},
+        ]
+        ordered = [c["slug"] for c in self.history.order(categories)]
+
+        self.assertEqual(ordered, ["new", "slow", "big", "small"])
+
+    def test_history_is_persisted(self) -> None:
+        self.history.record_total("pasty", 1000)
+        self.history.record_page("pasty", 100, 2.0)
+        self.history.save()
+
+        history = CategoryHistory(self.state_file)
+        self.assertEqual(history.estimate("pasty"), 20.0)
+
+    def test_corrupt_history_is_ignored(self) -> None:
+        with open(self.state_file, "w") as file:
+            file.write('{"pasty": {"total": 10')
+
+        history = CategoryHistory(self.state_file)
+        self.assertIsNone(history.estimate("pasty"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import unittest
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from storage import SQLiteStore
+
+
+def make_record(sku: str, price_datetime: str, price_promo: float) -> dict:
+    return {
+        "price_datetime": price_datetime,
+        "price": 150.0,
+        "price_promo": price_promo,
+        "sku_status": 1,
+        "sku_instock": [{"shopId": 104, "quantity": 3}],
+        "sku_article": sku,
+        "sku_name": "Зубная паста",
+        "sku_category": "Гигиена|Зубные пасты",
+        "sku_brand": None,
+        "sku_country": "Россия",
+        "sku_link": "https://novex.ru/catalog/product/pasta",
+        "sku_images": None,
+    }
+
+
+class TestSQLiteStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = SQLiteStore(":memory:", shop_id=104, batch_size=2)
+
+    def tearDown(self) -> None:
+        self.store.close()
+
+    def test_batches_are_flushed(self) -> None:
+        self.store.add_product(make_record("1", "2023-06-01 08:00:00", 99.0))
+        count = self.store.connection.execute(
+            "SELECT COUNT(*) FROM products"
+        ).fetchone()[0]
+        self.assertEqual(count, 0)
+
+        self.store.add_product(make_record("2", "2023-06-01 08:00:00", 99.0))
+        count = self.store.connection.execute(
+            "SELECT COUNT(*) FROM products"
+        ).fetchone()[0]
+        self.assertEqual(count, 2)
+
+    def test_upsert_and_price_history(self) -> None:
+        self.store.add_product(make_record("1", "2023-06-01 08:00:00", 99.0))
+        self.store.add_product(make_record("1", "2023-06-02 08:00:00", 89.0))
+        self.store.add_product(make_record("1", "2023-06-02 08:00:00", 79.0))
+        self.store.flush()
+
+        products = self.store.connection.execute(
+            "SELECT sku, price_promo, instock FROM products"
+        ).fetchall()
+        self.assertEqual(
+            products, [("1", 79.0, '[{"shopId": 104, "quantity": 3}]')]
+        )
+
+        self.assertEqual(
+            self.store.price_history("1"),
+            [
+                ("2023-06-01 08:00:00", 150.0, 99.0),
+                ("2023-06-02 08:00:00", 150.0, 79.0),
+            ],
+        )
+        self.assertEqual(self.store.price_history("1", shop_id=105), [])
+
+    def test_save_categories(self) -> None:
+        self.store.save_categories([[1, "Гигиена", "gigiena", ""]])
+        self.store.save_categories(
+            [
+                [1, "Гигиена и уход", "gigiena", ""],
+                [2, "Зубные пасты", "zubnye-pasty", "gigiena"],
+            ]
+        )
+
+        categories = self.store.connection.execute(
+            "SELECT slug, title, parent_slug FROM categories ORDER BY slug"
+        ).fetchall()
+        self.assertEqual(
+            categories,
+            [
+                ("gigiena", "Гигиена и уход", ""),
+                ("zubnye-pasty", "Зубные пасты", "gigiena"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import sys
 import os
 import logging
+import tempfile
 import unittest
 from unittest.mock import patch
 from time import sleep
@@ -13,9 +14,12 @@ from typing import Any
 # добавляем в пути системного окружения текущую директорию
 sys.path.append(os.getcwd())
 from stuff import (
+    LogSampler,
     logger,
     calculate_delay,
     get_time_to_sleep,
+    load_json_state,
+    save_json_state,
     sleep_between_requests,
     timer,
     request_repeater,
@@ -23,6 +27,45 @@ from stuff import (
 )
 
 
+class TestLogSampler(unittest.TestCase):
+    def test_should_log_every_n(self) -> None:
+        sampler = LogSampler({"products": 3})
+
+        result = [sampler.should_log("products") for _ in range(7)]
+
+        self.assertEqual(
+            result, [True, False, False, True, False, False, True]
+        )
+
+    def test_unknown_key_is_not_sampled(self) -> None:
+        sampler = LogSampler({"products": 100})
+
+        self.assertTrue(all(sampler.should_log("pages") for _ in range(5)))
+
+
+class TestJsonState(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.setLevel(level=logging.CRITICAL)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.tmp_dir.name, "state.json")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_save_and_load(self) -> None:
+        save_json_state(self.state_file, {"pasty": 1})
+
+        self.assertEqual(load_json_state(self.state_file, {}), {"pasty": 1})
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["state.json"])
+
+    def test_missing_or_corrupt_file(self) -> None:
+        self.assertEqual(load_json_state(self.state_file, {}), {})
+
+        with open(self.state_file, "w") as file:
+            file.write('{"pasty": ')
+        self.assertEqual(load_json_state(self.state_file, {}), {})
+
+
 class TestCalculateDelay(unittest.TestCase):
     def test_calculate_delay_returns_seconds(self) -> None:
         self.assertEqual(calculate_delay(1, 1, 0.5), 1)
@@ -87,6 +130,11 @@ class TestSleepBetweenRequests(unittest.TestCase):
             sleep_between_requests(0)
             mock_sleep.assert_not_called()
 
+    def test_sleep_without_log(self) -> None:
+        with patch("stuff.sleep"), patch("stuff.logger.debug") as mock_debug:
+            sleep_between_requests(1, log=False)
+            mock_debug.assert_not_called()
+
 
 class TestTimerDecorator(unittest.TestCase):
     def setUp(self) -> None:
@@ -177,6 +225,29 @@ class TestRequestRepeaterDecorator(unittest.TestCase):
             "Exception in: func: Something went wrong"
         )
 
+    def test_sleep_log_is_sampled(self) -> None:
+        class DummyObject:
+            config = {
+                "delay_range_s": [0, 1],
+                "backoff_factor": 2,
+                "max_retries": 3,
+            }
+            log_sampler = LogSampler({"sleeps": 3})
+
+            @request_repeater
+            def func(self) -> Any:
+                return 89
+
+        obj = DummyObject()
+
+        with patch("stuff.get_time_to_sleep", return_value=0), \
+                patch("stuff.sleep_between_requests") as mock_sleep:
+            for _ in range(6):
+                obj.func()
+
+        logged = [call.kwargs["log"] for call in mock_sleep.call_args_list]
+        self.assertEqual(logged, [True, False, False, True, False, False])
+
 
 class TestRestarterDecorator(unittest.TestCase):
     def setUp(self) -> None:
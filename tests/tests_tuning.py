@@ -0,0 +1,83 @@
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from stuff import logger
+from tuning import GLOBAL_KEY, LimitTuner
+
+
+class TestLimitTuner(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.setLevel(level=logging.CRITICAL)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.tmp_dir.name, "limits.json")
+        self.tuner = LimitTuner([25, 50, 100, 200], 50, self.state_file)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_default_for_unknown_category(self) -> None:
+        self.assertEqual(self.tuner.choose("pasty"), 50)
+
+    def test_tries_bigger_limit_after_success(self) -> None:
+        self.tuner.record("pasty", 50, 50, 1.0, failed=False)
+
+        self.assertEqual(self.tuner.choose("pasty"), 100)
+
+    def test_keeps_faster_limit(self) -> None:
+        self.tuner.record("pasty", 50, 50, 1.0, failed=False)
+        self.tuner.record("pasty", 100, 100, 4.0, failed=False)
+
+        self.assertEqual(self.tuner.choose("pasty"), 50)
+
+    def test_tries_smaller_limit_after_failure(self) -> None:
+        self.tuner.record("pasty", 50, 50, 5.0, failed=True)
+
+        self.assertEqual(self.tuner.choose("pasty"), 25)
+
+    def test_global_stats_for_new_category(self) -> None:
+        self.tuner.record("pasty", 100, 100, 1.0, failed=False)
+        self.tuner.record("pasty", 200, 200, 4.0, failed=False)
+
+        self.assertIn("100", self.tuner.stats[GLOBAL_KEY])
+        self.assertEqual(self.tuner.choose("shampuni"), 100)
+
+    def test_state_is_persisted(self) -> None:
+        self.tuner.record("pasty", 100, 100, 1.0, failed=False)
+        self.tuner.record("pasty", 200, 200, 4.0, failed=False)
+        self.tuner.save()
+
+        tuner = LimitTuner([25, 50, 100, 200], 50, self.state_file)
+        self.assertEqual(tuner.choose("pasty"), 100)
+
+    def test_limits_outside_ladder_are_ignored(self) -> None:
+        self.tuner.record("pasty", 20, 20, 0.1, failed=False)
+
+        self.assertNotIn("pasty", self.tuner.stats)
+        self.assertEqual(self.tuner.choose("pasty"), 50)
+
+    def test_default_is_snapped_to_ladder(self) -> None:
+        tuner = LimitTuner([25, 50, 100, 200], 150, self.state_file)
+        self.assertEqual(tuner.choose("pasty"), 100)
+
+        tuner.record("pasty", 100, 100, 1.0, failed=False)
+        self.assertIn("100", tuner.stats["pasty"])
+
+    def test_limits_must_divide_each_other(self) -> None:
+        with self.assertRaises(ValueError):
+            LimitTuner([60, 100], 60, self.state_file)
+
+    def test_corrupt_state_is_ignored(self) -> None:
+        with open(self.state_file, "w") as file:
+            file.write('{"pasty": {"100": {"rate"')
+
+        tuner = LimitTuner([25, 50, 100, 200], 50, self.state_file)
+        self.assertEqual(tuner.choose("pasty"), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
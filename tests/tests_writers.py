@@ -0,0 +1,97 @@
+import csv
+import gzip
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# flake8: noqa
+sys.path.append(os.getcwd())
+from writers import (
+    FLOAT,
+    INT,
+    STR,
+    get_writer,
+    infer_column_type,
+    read_columnar,
+    write_columnar,
+    write_csv,
+    write_csv_gz,
+    write_jsonl,
+)
+
+
+ROWS = [
+    ["price_datetime", "price", "sku_status", "sku_instock", "sku_name"],
+    ["2023-06-01 08:17:33", 134.99, 1, [{"shop": 104}], "Паста"],
+    ["2023-06-01 08:17:34", 99.0, None, None, None],
+]
+
+
+class TestWriters(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.base = os.path.join(self.tmp_dir.name, "products")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_write_csv(self) -> None:
+        filename = write_csv(self.base, ROWS)
+
+        self.assertTrue(filename.endswith(".csv"))
+        with open(filename, newline="") as file:
+            rows = list(csv.reader(file, delimiter=";"))
+        self.assertEqual(rows[0], ROWS[0])
+        self.assertEqual(rows[1][4], "Паста")
+
+    def test_write_csv_gz(self) -> None:
+        filename = write_csv_gz(self.base, ROWS)
+
+        with gzip.open(filename, "rt", newline="") as file:
+            rows = list(csv.reader(file, delimiter=";"))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2][1], "99.0")
+
+    def test_write_jsonl(self) -> None:
+        filename = write_jsonl(self.base, ROWS)
+
+        with open(filename, encoding="utf-8") as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["price"], 134.99)
+        self.assertEqual(records[0]["sku_instock"], '[{"shop": 104}]')
+        self.assertIsNone(records[1]["sku_name"])
+
+    def test_columnar_roundtrip(self) -> None:
+        filename = write_columnar(self.base, ROWS)
+
+        columns = read_columnar(filename)
+        self.assertEqual(columns["price"], [134.99, 99.0])
+        self.assertEqual(columns["sku_status"], [1, None])
+        self.assertEqual(columns["sku_name"], ["Паста", None])
+        self.assertEqual(columns["sku_instock"], ['[{"shop": 104}]', None])
+
+    def test_columnar_empty(self) -> None:
+        filename = write_columnar(self.base, ROWS[:1])
+
+        columns = read_columnar(filename)
+        self.assertEqual(columns["price"], [])
+
+    def test_get_writer_unknown_format(self) -> None:
+        with self.assertRaises(ValueError):
+            get_writer("xlsx")
+
+
+class TestInferColumnType(unittest.TestCase):
+    def test_infer_column_type(self) -> None:
+        self.assertEqual(infer_column_type([1.5, None, 2.0]), FLOAT)
+        self.assertEqual(infer_column_type([1, 0, None]), INT)
+        self.assertEqual(infer_column_type([1, "a"]), STR)
+        self.assertEqual(infer_column_type([None, None]), STR)
+        self.assertEqual(infer_column_type([True, False]), STR)
+
+
+if __name__ == "__main__":
+    unittest.main()
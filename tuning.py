@@ -0,0 +1,117 @@
+"""Автоподбор products_limit по категориям.
+
+Для каждой категории и глобально копится скорость получения товаров
+(товаров в секунду, экспоненциальное сглаживание) и доля некорректных
+ответов для каждого размера страницы из заданной лестницы limits.
+Выбирается размер с лучшей оценкой, соседний больший размер
+периодически пробуется (подъём на холм). Состояние сохраняется в JSON.
+"""
+import threading
+from copy import deepcopy
+
+from stuff import load_json_state, logger, save_json_state
+
+
+GLOBAL_KEY = "__global__"
+
+
+class LimitTuner:
+    def __init__(
+        self,
+        limits: list[int],
+        default: int,
+        state_file: str,
+        smoothing: float = 0.3,
+    ):
+        self.limits = sorted(limits)
+        # при смене размера окна выравниваются по НОД (см. window_limit),
+        # поэтому каждый размер должен делить следующий: иначе страницы
+        # после смены размера мельчают вплоть до 1 товара
+        for smaller, bigger in zip(self.limits, self.limits[1:]):
+            if bigger % smaller:
+                raise ValueError(
+                    f"Autotune limits must divide each other: {self.limits}"
+                )
+
+        # размер по умолчанию вне лестницы никогда не учитывается
+        # в статистике -- берём ближайший размер из лестницы
+        self.default = min(
+            self.limits, key=lambda limit: (abs(limit - default), limit)
+        )
+        if self.default != default:
+            logger.warning(
+                f"products_limit {default} is not in autotune limits, "
+                + f"{self.default} is used instead."
+            )
+        self.state_file = state_file
+        self.smoothing = smoothing
+
+        # {key: {limit (str): {"rate": float, "requests": int,
+        #                      "failures": int}}}
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Загружает сохранённое состояние, если файл есть"""
+        self.stats = load_json_state(self.state_file, {})
+
+    def save(self) -> None:
+        with self.lock:
+            stats = deepcopy(self.stats)
+        save_json_state(self.state_file, stats)
+
+    def _score(self, stat: dict) -> float:
+        """Оценка размера: скорость с поправкой на долю сбоев"""
+        failure_rate = stat["failures"] / stat["requests"]
+        return stat["rate"] * (1 - failure_rate)
+
+    def _best(self, key: str) -> int:
+        # только размеры из лестницы: в файле могут остаться другие
+        stats = {
+            limit: stat
+            for limit, stat in self.stats.get(key, {}).items()
+            if int(limit) in self.limits
+        }
+        if not stats:
+            return None
+        return int(max(stats, key=lambda limit: self._score(stats[limit])))
+
+    def choose(self, key: str) -> int:
+        """Размер страницы для очередного запроса категории key"""
+        with self.lock:
+            best = self._best(key) or self._best(GLOBAL_KEY) or self.default
+            stats = self.stats.get(key, {})
+
+            if str(best) not in stats:
+                return best
+
+            # лучший размер без сбоев -- пробуем следующий больший,
+            # со сбоями -- следующий меньший, если их ещё не пробовали
+            if stats[str(best)]["failures"]:
+                neighbours = [
+                    limit for limit in reversed(self.limits) if limit < best
+                ]
+            else:
+                neighbours = [limit for limit in self.limits if limit > best]
+
+            if neighbours and str(neighbours[0]) not in stats:
+                return neighbours[0]
+            return best
+
+    def record(
+        self, key: str, limit: int, items: int, elapsed: float, failed: bool
+    ) -> None:
+        """Учитывает результат запроса страницы размером limit"""
+        if limit not in self.limits:
+            return
+        rate = items / elapsed if elapsed > 0 else 0.0
+        with self.lock:
+            for stats_key in (key, GLOBAL_KEY):
+                stats = self.stats.setdefault(stats_key, {})
+                stat = stats.setdefault(
+                    str(limit), {"rate": rate, "requests": 0, "failures": 0}
+                )
+                stat["rate"] += self.smoothing * (rate - stat["rate"])
+                stat["requests"] += 1
+                stat["failures"] += int(failed)
@@ -0,0 +1,252 @@
+"""Writers: сохранение подготовленных строк в разных форматах.
+
+Каждый writer принимает имя файла без расширения и список строк, где первая
+строка -- заголовки колонок (как self.data_to_save в парсере),
+и возвращает имя записанного файла.
+"""
+import csv
+import gzip
+import io
+import json
+import struct
+from array import array
+from typing import Any, Callable
+
+try:
+    import zstandard
+except ImportError:  # необязательная зависимость
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # необязательная зависимость
+    pyarrow = None
+
+
+CSV_DELIMITER = ";"
+
+# простой типизированный колоночный формат, если pyarrow не установлен
+COLUMNAR_MAGIC = b"NVXCOL1\n"
+
+FLOAT = "float64"
+INT = "int64"
+STR = "str"
+
+
+def to_text(value: Any) -> Any:
+    """Приводит нескалярные значения (списки, словари) к тексту"""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _write_csv_stream(stream: io.TextIOBase, rows: list[list]) -> None:
+    writer = csv.writer(stream, delimiter=CSV_DELIMITER)
+    writer.writerows(rows)
+
+
+def write_csv(filename: str, rows: list[list]) -> str:
+    """Несжатый CSV с разделителем ';'"""
+    filename += ".csv"
+    with open(filename, "w", newline="") as file:
+        _write_csv_stream(file, rows)
+    return filename
+
+
+def write_csv_gz(filename: str, rows: list[list]) -> str:
+    """CSV, сжатый gzip"""
+    filename += ".csv.gz"
+    with gzip.open(filename, "wt", newline="") as file:
+        _write_csv_stream(file, rows)
+    return filename
+
+
+def write_csv_zst(filename: str, rows: list[list]) -> str:
+    """CSV, сжатый zstd. Требует пакет zstandard"""
+    if zstandard is None:
+        raise RuntimeError("zstd output requires 'zstandard' package")
+
+    filename += ".csv.zst"
+    with open(filename, "wb") as raw:
+        compressor = zstandard.ZstdCompressor()
+        with compressor.stream_writer(raw) as compressed:
+            with io.TextIOWrapper(
+                compressed, encoding="utf-8", newline=""
+            ) as file:
+                _write_csv_stream(file, rows)
+    return filename
+
+
+def write_jsonl(filename: str, rows: list[list]) -> str:
+    """JSON Lines: по одному объекту на строку"""
+    filename += ".jsonl"
+    header, *data = rows
+    with open(filename, "w", encoding="utf-8") as file:
+        for row in data:
+            record = dict(zip(header, (to_text(el) for el in row)))
+            file.write(json.dumps(record, ensure_ascii=False))
+            file.write("\n")
+    return filename
+
+
+def infer_column_type(values: list) -> str:
+    """Определяет тип колонки по непустым значениям"""
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, float) for v in present):
+        return FLOAT
+    if present and all(
+        isinstance(v, int) and not isinstance(v, bool) for v in present
+    ):
+        return INT
+    return STR
+
+
+def rows_to_columns(rows: list[list]) -> tuple[list[str], list[list]]:
+    """Транспонирует строки в колонки. Первая строка -- заголовки"""
+    header, *data = rows
+    columns = [list(column) for column in zip(*data)] if data else []
+    if not columns:
+        columns = [[] for _ in header]
+    return header, columns
+
+
+def _encode_column(values: list, column_type: str) -> bytes:
+    """Кодирует колонку: байтовая маска пустых значений + данные"""
+    nulls = bytes(1 if v is None else 0 for v in values)
+
+    if column_type == FLOAT:
+        data = array("d", (0.0 if v is None else v for v in values))
+        return nulls + data.tobytes()
+
+    if column_type == INT:
+        data = array("q", (0 if v is None else v for v in values))
+        return nulls + data.tobytes()
+
+    encoded = [
+        b"" if v is None else str(to_text(v)).encode("utf-8")
+        for v in values
+    ]
+    offsets = array("q", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return nulls + offsets.tobytes() + b"".join(encoded)
+
+
+def write_columnar(filename: str, rows: list[list]) -> str:
+    """Простой типизированный колоночный формат.
+
+    Структура файла: COLUMNAR_MAGIC, длина JSON-заголовка (uint32, LE),
+    JSON-заголовок {"rows", "columns": [{"name", "type", "size"}]},
+    далее колонки подряд. Числа хранятся в little-endian.
+    """
+    filename += ".col"
+    header, columns = rows_to_columns(rows)
+
+    meta = {"rows": len(rows) - 1, "columns": []}
+    chunks = []
+    for name, values in zip(header, columns):
+        column_type = infer_column_type(values)
+        chunk = _encode_column(values, column_type)
+        meta["columns"].append(
+            {"name": name, "type": column_type, "size": len(chunk)}
+        )
+        chunks.append(chunk)
+
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    with open(filename, "wb") as file:
+        file.write(COLUMNAR_MAGIC)
+        file.write(struct.pack("<I", len(meta_bytes)))
+        file.write(meta_bytes)
+        for chunk in chunks:
+            file.write(chunk)
+    return filename
+
+
+def read_columnar(filename: str) -> dict[str, list]:
+    """Читает файл, записанный write_columnar.
+    Возвращает {колонка: значения}
+    """
+    with open(filename, "rb") as file:
+        content = file.read()
+
+    if not content.startswith(COLUMNAR_MAGIC):
+        raise ValueError(f"'{filename}' is not a columnar file")
+
+    position = len(COLUMNAR_MAGIC)
+    (meta_size,) = struct.unpack_from("<I", content, position)
+    position += 4
+    meta = json.loads(content[position:position + meta_size])
+    position += meta_size
+
+    rows = meta["rows"]
+    result = {}
+    for column in meta["columns"]:
+        chunk = content[position:position + column["size"]]
+        position += column["size"]
+        nulls, body = chunk[:rows], chunk[rows:]
+
+        if column["type"] in (FLOAT, INT):
+            data = array("d" if column["type"] == FLOAT else "q")
+            data.frombytes(body)
+            values = list(data)
+        else:
+            offsets = array("q")
+            offsets.frombytes(body[:(rows + 1) * 8])
+            blob = body[(rows + 1) * 8:]
+            values = [
+                blob[offsets[i]:offsets[i + 1]].decode("utf-8")
+                for i in range(rows)
+            ]
+
+        result[column["name"]] = [
+            None if is_null else value
+            for is_null, value in zip(nulls, values)
+        ]
+    return result
+
+
+def write_parquet(filename: str, rows: list[list]) -> str:
+    """Parquet через pyarrow, при его отсутствии -- write_columnar"""
+    if pyarrow is None:
+        return write_columnar(filename, rows)
+
+    filename += ".parquet"
+    header, columns = rows_to_columns(rows)
+    arrow_types = {
+        FLOAT: pyarrow.float64(),
+        INT: pyarrow.int64(),
+        STR: pyarrow.string(),
+    }
+
+    arrays = []
+    for values in columns:
+        column_type = infer_column_type(values)
+        if column_type == STR:
+            values = [None if v is None else str(to_text(v)) for v in values]
+        arrays.append(pyarrow.array(values, type=arrow_types[column_type]))
+
+    table = pyarrow.Table.from_arrays(arrays, names=header)
+    pyarrow.parquet.write_table(table, filename, compression="zstd")
+    return filename
+
+
+WRITERS: dict[str, Callable[[str, list[list]], str]] = {
+    "csv": write_csv,
+    "csv.gz": write_csv_gz,
+    "csv.zst": write_csv_zst,
+    "jsonl": write_jsonl,
+    "parquet": write_parquet,
+    "columnar": write_columnar,
+}
+
+
+def get_writer(output_format: str) -> Callable[[str, list[list]], str]:
+    """Возвращает writer для заданного формата"""
+    try:
+        return WRITERS[output_format]
+    except KeyError:
+        raise ValueError(
+            f"Unknown output format '{output_format}'. "
+            + f"Available: {', '.join(WRITERS)}"
+        ) from None